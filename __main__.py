@@ -20,6 +20,13 @@ Moving any of these folders or files will prevent the game from working properly
 Author: Walker M. White (wmw2)
 Date:   November 20, 2019
 """
+import sys
+import consts
+
+# Read the configuration before any game module copies the constants
+consts.ALIEN_ROWS, consts.ALIENS_IN_ROW, consts.ALIEN_SPEED = consts.readConfig(sys.argv[1:])
+consts.SWARM_MODE = consts.readSwarm(sys.argv[1:])
+
 from consts import *
 from app import *
 
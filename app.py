@@ -69,13 +69,13 @@ class Invaders(GameApp):
         _sKeyPressed:   states whether the 's' key was pressed in the last frame
                         [bool]
         _score          text which shows the current score of the player
-                        [GLabel or None]
+                        [GText or None]
         _message        currently active message
                         [GLabel or None]
         _instructions   text with instructions for player
                         [GLabel or None]
         _lives          text which shows the remaining lives of the player
-                        [GLabel or None]
+                        [GText or None]
         _background     the background of the game
                         [GRectangle]
         _win            states whether the player won or not
@@ -85,6 +85,9 @@ class Invaders(GameApp):
         _recordMessage  text message which appears at the end of the game if
                         the player sets a new record
                         [GLabel or None]
+        _labels         the messages and instructions made so far, so that they
+                        are only made again when their text changes
+                        [GLabelCache]
     """
 
     # DO NOT MAKE A NEW INITIALIZER!
@@ -114,6 +117,7 @@ class Invaders(GameApp):
         self._score = None
         self._lives = None
         self._recordMessage = None
+        self._labels = GLabelCache()
 
     def update(self,dt):
         """
@@ -167,7 +171,7 @@ class Invaders(GameApp):
             self._win = False
             self._checkKeyPressed()
         if self._state == STATE_NEWWAVE:
-            self._wave = Wave()
+            self._wave = Wave(swarm=SWARM_MODE)
             self._state = STATE_ACTIVE
         if self._state == STATE_ACTIVE:
             playkeys_pressed = [self.input.is_key_down('right'),
@@ -245,28 +249,28 @@ class Invaders(GameApp):
         the current state of the game.
         """
         if self._state == STATE_INACTIVE:
-            self._instructions = GLabel(text="Press 'S' To Start",font_size =50,
+            self._instructions = self._labels.get(text="Press 'S' To Start",font_size =50,
             x= 400, y = 400, linecolor = 'yellow', font_name = FONT)
         if self._state == STATE_NEWWAVE:
             self._instructions = None
         if self._state == STATE_ACTIVE:
             self._setTextActive()
         if self._state == STATE_PAUSED:
-            self._instructions = GLabel(text="Press 'S' To Continue",
+            self._instructions = self._labels.get(text="Press 'S' To Continue",
             font_size=50, x= 400, y =400, linecolor = 'yellow',font_name = FONT)
-            self._lives = GLabel(text="Lives: "+ str(self._wave.getLives()),
-            font_size =30,x=730, y =680, linecolor ='yellow', font_name =FONT)
+            self._lives = self._setCounter(self._lives,
+            "Lives: "+ str(self._wave.getLives()), 730)
         if self._state == STATE_COMPLETE:
-            self._score =  GLabel(text="Score: "+ str(self._wave.getScore()),
-            font_size = 30, x= 90, y =680, linecolor ='yellow', font_name =FONT)
+            self._score = self._setCounter(self._score,
+            "Score: "+ str(self._wave.getScore()), 90)
             if self._win:
-                self._message = GLabel(text="You Win", font_size = 50,
+                self._message = self._labels.get(text="You Win", font_size = 50,
                 x= 400, y = 400, linecolor = 'yellow', font_name = FONT)
             elif not self._win:
-                self._message = GLabel(text="You Lose", font_size = 50,
+                self._message = self._labels.get(text="You Lose", font_size = 50,
                 x= 400, y = 400, linecolor = 'yellow', font_name = FONT)
             self._lives = None
-            self._instructions = GLabel(text="Press 'S' To Play Again",
+            self._instructions = self._labels.get(text="Press 'S' To Play Again",
             font_size =50, x =400, y =300, linecolor ='yellow', font_name =FONT)
         else:
             self._recordMessage = None #Record messages only at STATE_COMPLETE
@@ -276,15 +280,39 @@ class Invaders(GameApp):
         This method changes the text messages on the screen (_message,
          _score, _instructions, _lives) when the game is in STATE_ACTIVE.
         """
-        self._instructions = GLabel(text="Press 'S' To Turn Sound On/Off",
+        self._instructions = self._labels.get(text="Press 'S' To Turn Sound On/Off",
         font_size = 20, x=630, y =20, linecolor ='yellow', font_name = FONT)
-        self._score =  GLabel(text="Score: "+ str(self._wave.getScore()),
-        font_size = 30, x= 90, y =680, linecolor ='yellow', font_name =FONT)
-        self._lives = GLabel(text="Lives: "+ str(self._wave.getLives()),
-        font_size =30,x=730, y =680, linecolor ='yellow', font_name =FONT)
-        self._message=GLabel(text="Personal Best: "+str(self._personalBest),
+        self._score = self._setCounter(self._score,
+        "Score: "+ str(self._wave.getScore()), 90)
+        self._lives = self._setCounter(self._lives,
+        "Lives: "+ str(self._wave.getLives()), 730)
+        self._message=self._labels.get(text="Personal Best: "+str(self._personalBest),
         font_size =30,x=400, y =680, linecolor ='yellow', font_name =FONT)
 
+    def _setCounter(self, label, text, x):
+        """
+        Returns a counter showing text at the top of the screen, centered at x.
+
+        The score and the lives change during a wave, so they are GText objects, drawn
+        from pre-rendered glyphs, rather than labels.  The existing counter (if any)
+        gets the new text, which costs nothing if the text did not change and only a
+        few array operations if it did.
+
+        Parameter label: the counter shown in the last frame
+        Precondition: label is a GText or None
+
+        Parameter text: the text to show
+        Precondition: text is a string
+
+        Parameter x: the x-coordinate of the center of the label
+        Precondition: x is a number (int or float)
+        """
+        if label == None:
+            return GText(text=text, font_size =30, x=x, y =680,
+            linecolor ='yellow', font_name =FONT)
+        label.text = text
+        return label
+
     def _checkRecord(self):
         """
         This method checks if the player set a new record. If yes, the method
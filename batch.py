@@ -0,0 +1,434 @@
+"""
+Batched headless simulation for Alien Invaders
+
+This module contains WaveBatch, which runs many independent waves in lockstep.  Where
+a WaveEngine keeps the state of one wave in Python attributes, a WaveBatch keeps the
+state of N waves in arrays with one row per game: the ship positions, the lives and
+scores, an (N, rows, cols) mask of live aliens and an (N, capacity) pool of alien
+bolts.  One tick of every game is then a fixed number of array operations, so the
+cost of a tick grows far slower than N and the throughput (game ticks per second)
+grows close to linearly in N.  We use this for bot training and capacity tests.
+
+The rules are the rules of WaveEngine, tick for tick.  Given the same seed and the
+same input, a game in a batch plays out exactly like a WaveEngine in fixed-timestep
+mode (with setShip called as soon as the ship is destroyed).  The only Python loop
+left in a tick is over the games whose aliens fire on that tick, which is a few
+games per alien step, because each game draws from its own random.Random.
+
+A few things differ from WaveEngine, because a batch is meant for bots:
+    * Games that are over (won or lost) freeze until the end of the batch.
+    * With autorespawn (the default), a destroyed ship is replaced on the next tick,
+      as long as the game has lives left.
+    * No events are reported, and no input log is kept.
+
+Like engine.py, this module never imports game2d or Kivy.
+"""
+from consts import *
+from formation import H_PITCH, V_PITCH
+import numpy as np
+import random
+
+
+class WaveBatch(object):
+    """
+    This class simulates N independent waves of Alien Invaders in lockstep.
+
+    Every alien block in a batch starts at the same place and moves as a rigid grid,
+    so the block of game i is stored as an offset (_offX[i], _offY[i]) from the
+    starting grid, plus the mask _alive[i] of live aliens.  Row 0 is the bottom row
+    and column 0 is the leftmost column, as in Formation.
+
+    Each game has at most one player bolt (the ship cannot fire while its bolt is on
+    screen), stored in the arrays _px, _py and _pUsed.  The alien bolts of game i are
+    the slots of row i in _bx, _by and _bUsed.
+
+    INSTANCE ATTRIBUTES:
+        _count:  the number of games [int > 0]
+        _rate:   the ticks per second [int > 0]
+        _step:   the length of a tick in seconds [float > 0]
+        _lag:    the frame time not yet simulated [0 <= float < _step]
+        _ticks:  the number of ticks simulated so far [int >= 0]
+        _shipSpeed: the pixels the ship moves per tick [number > 0]
+        _boltSpeed: the pixels a bolt moves per tick [number > 0]
+        _autorespawn: whether destroyed ships are replaced on the next tick [bool]
+        _seeds:  the seed of each game [list of int]
+        _randoms: the random number generator of each game [list of random.Random]
+        _shipX:  the x-coordinate of each ship [float array, NaN if destroyed]
+        _lives:  the number of lives left in each game [int array]
+        _score:  the score of each game [int array]
+        _time:   the time since the last alien step of each game [float array]
+        _waveSpeed: the seconds between alien steps of each game [float array]
+        _right:  whether the aliens of each game are moving right [bool array]
+        _stepsToFire: the alien steps before the next alien bolt [int array]
+        _alive:  whether each alien is alive [bool array (N, rows, cols)]
+        _aliveCount: the number of live aliens in each game [int array]
+        _offX:   the horizontal offset of each block [float array]
+        _offY:   the vertical offset of each block [float array]
+        _left:   the x-coordinate of the bottom left alien at the start [float]
+        _bottom: the y-coordinate of the bottom left alien at the start [float]
+        _px:     the x-coordinate of each player bolt [float array]
+        _py:     the y-coordinate of each player bolt [float array]
+        _pUsed:  whether each game has a player bolt [bool array]
+        _bx:     the x-coordinate of each alien bolt [float array (N, capacity)]
+        _by:     the y-coordinate of each alien bolt [float array (N, capacity)]
+        _bUsed:  whether each alien bolt slot holds a bolt [bool array (N, capacity)]
+        _won:    whether each game is won [bool array]
+        _done:   whether each game is over [bool array]
+    """
+
+    # GETTERS AND SETTERS
+    def getCount(self):
+        """
+        Returns the number of games in this batch.
+        """
+        return self._count
+
+    def getTicks(self):
+        """
+        Returns the number of simulation ticks run so far.
+        """
+        return self._ticks
+
+    def getSeeds(self):
+        """
+        Returns the list of seeds, one per game.
+        """
+        return list(self._seeds)
+
+    def getScores(self):
+        """
+        Returns a copy of the score of each game [int array].
+        """
+        return self._score.copy()
+
+    def getLives(self):
+        """
+        Returns a copy of the lives left in each game [int array].
+        """
+        return self._lives.copy()
+
+    def getAliensLeft(self):
+        """
+        Returns a copy of the number of aliens left in each game [int array].
+        """
+        return self._aliveCount.copy()
+
+    def getShipX(self):
+        """
+        Returns a copy of the x-coordinate of each ship [float array, NaN if destroyed].
+        """
+        return self._shipX.copy()
+
+    def getDone(self):
+        """
+        Returns a copy of whether each game is over [bool array].
+        """
+        return self._done.copy()
+
+    def getWon(self):
+        """
+        Returns a copy of whether each game is won [bool array].
+        """
+        return self._won.copy()
+
+    def getAlive(self):
+        """
+        Returns the mask of live aliens [bool array (N, rows, cols)].
+
+        The array is shared with this batch, so it should be treated as read-only.
+        """
+        return self._alive
+
+    def setShips(self, games=None):
+        """
+        Places a new ship at the center of the screen in some games.
+
+        Only games whose ship is destroyed, that have lives left and that are not over
+        get a new ship.
+
+        Parameter games: the games to respawn (None for every game)
+        Precondition: games is None, a bool array of length N, or a sequence of ints
+        """
+        mask = np.isnan(self._shipX) & (self._lives > 0) & ~self._done
+        if games is not None:
+            chosen = np.zeros(self._count, dtype=np.bool_)
+            chosen[games] = True
+            mask &= chosen
+        self._shipX[mask] = GAME_WIDTH/2
+
+    # INITIALIZER
+    def __init__(self, count, rate=SIM_RATE, seeds=None, capacity=BOLT_CAPACITY,
+                 autorespawn=True, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, speed=ALIEN_SPEED):
+        """
+        Initializes a batch of new waves, each with a full block of aliens and a ship.
+
+        Parameter count: the number of games
+        Precondition: count is an int > 0
+
+        Parameter rate: the number of fixed simulation ticks per second
+        Precondition: rate is an int > 0
+
+        Parameter seeds: the seed of each game (None picks them)
+        Precondition: seeds is None, or a sequence of count ints
+
+        Parameter capacity: the most alien bolts that can be on screen in one game
+        Precondition: capacity is an int > 0
+
+        Parameter autorespawn: whether to replace destroyed ships automatically
+        Precondition: autorespawn is a bool
+
+        Parameter rows: the number of rows of aliens in every game
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row in every game
+        Precondition: cols is an int > 0
+
+        Parameter speed: the initial number of seconds between alien steps
+        Precondition: speed is a number > 0
+        """
+        if seeds is None:
+            seeds = [random.getrandbits(32) for _ in range(count)]
+        assert len(seeds) == count, 'there must be one seed per game'
+        self._count = count
+        self._rate = rate
+        self._step = 1.0/rate
+        self._lag = 0
+        self._ticks = 0
+        self._shipSpeed = SHIP_MOVEMENT*FRAME_RATE/rate
+        self._boltSpeed = BOLT_SPEED*FRAME_RATE/rate
+        self._autorespawn = autorespawn
+        self._seeds = list(seeds)
+        self._randoms = [random.Random(seed) for seed in self._seeds]
+
+        self._shipX = np.full(count, GAME_WIDTH/2)
+        self._lives = np.full(count, SHIP_LIVES, dtype=np.int64)
+        self._score = np.zeros(count, dtype=np.int64)
+        self._time = np.zeros(count)
+        self._waveSpeed = np.full(count, float(speed))
+        self._right = np.ones(count, dtype=np.bool_)
+        self._stepsToFire = np.array([rng.randint(1,BOLT_RATE) for rng in self._randoms],
+                                     dtype=np.int64)
+
+        self._alive = np.ones((count, rows, cols), dtype=np.bool_)
+        self._aliveCount = np.full(count, rows*cols, dtype=np.int64)
+        self._offX = np.zeros(count)
+        self._offY = np.zeros(count)
+        block_height = rows * ALIEN_HEIGHT + (rows-1)*ALIEN_H_SEP
+        self._left = ALIEN_H_SEP + ALIEN_WIDTH/2
+        self._bottom = GAME_HEIGHT - block_height - ALIEN_CEILING
+
+        self._px = np.zeros(count)
+        self._py = np.zeros(count)
+        self._pUsed = np.zeros(count, dtype=np.bool_)
+        self._bx = np.zeros((count, capacity))
+        self._by = np.zeros((count, capacity))
+        self._bUsed = np.zeros((count, capacity), dtype=np.bool_)
+
+        self._won = np.zeros(count, dtype=np.bool_)
+        self._done = np.zeros(count, dtype=np.bool_)
+
+    # UPDATE METHODS
+    def update(self, inputs, dt):
+        """
+        Returns (scores, lives, aliens left, done) after advancing every game by a frame.
+
+        This runs every whole tick that fits in the time not yet simulated (possibly
+        none), all with the same input, like WaveEngine.update.  The result arrays are
+        copies, one entry per game.
+
+        Parameter inputs: whether right, left and fire are pressed in each game
+        Precondition: inputs is an array-like of bools of shape (N,3)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        inputs = np.asarray(inputs, dtype=np.bool_)
+        self._lag = min(self._lag+dt, SIM_MAX_LAG)
+        while self._lag >= self._step:
+            self._lag -= self._step
+            self._tick(inputs)
+        return self._results()
+
+    def tick(self, inputs):
+        """
+        Returns (scores, lives, aliens left, done) after advancing every game one tick.
+
+        Parameter inputs: whether right, left and fire are pressed in each game
+        Precondition: inputs is an array-like of bools of shape (N,3)
+        """
+        self._tick(np.asarray(inputs, dtype=np.bool_))
+        return self._results()
+
+    # HELPER METHODS FOR UPDATE
+    def _results(self):
+        """
+        Returns copies of the scores, lives, aliens left and done flags.
+        """
+        return (self.getScores(), self.getLives(), self.getAliensLeft(), self.getDone())
+
+    def _tick(self, inputs):
+        """
+        Advances every game that is not over by one simulation tick.
+
+        Parameter inputs: whether right, left and fire are pressed in each game
+        Precondition: inputs is a bool array of shape (N,3)
+        """
+        if self._autorespawn:
+            self.setShips()
+        active = ~self._done
+        self._shipController(inputs, active)
+        self._alienController(active)
+        self._boltsController(active)
+        self._checkOutcomes()
+        self._ticks += 1
+
+    def _shipController(self, inputs, active):
+        """
+        Moves the ships and fires new player bolts, according to the input.
+
+        Parameter inputs: whether right, left and fire are pressed in each game
+        Precondition: inputs is a bool array of shape (N,3)
+
+        Parameter active: whether each game is still running
+        Precondition: active is a bool array of length N
+        """
+        ship = active & ~np.isnan(self._shipX)
+        x = self._shipX
+        right = ship & inputs[:,0]
+        x[right] += np.minimum(self._shipSpeed, GAME_WIDTH - SHIP_WIDTH/2 - x[right])
+        left = ship & inputs[:,1]
+        x[left] -= np.minimum(self._shipSpeed, x[left] - SHIP_WIDTH/2)
+        fire = ship & inputs[:,2] & ~self._pUsed
+        self._px[fire] = x[fire]
+        self._py[fire] = SHIP_BOTTOM + SHIP_HEIGHT + BOLT_HEIGHT/2
+        self._pUsed |= fire
+
+    def _alienController(self, active):
+        """
+        Moves the blocks of aliens that are due a step, and fires their bolts.
+
+        Parameter active: whether each game is still running
+        Precondition: active is a bool array of length N
+        """
+        self._time[active] += self._step
+        games = (active & (self._time >= self._waveSpeed) &
+                 (self._aliveCount > 0)).nonzero()[0]
+        if len(games) == 0:
+            return
+
+        live = self._alive[games].any(axis=1)
+        cols = live.shape[1]
+        rightest = self._left + self._offX[games] + H_PITCH*(cols-1-live[:,::-1].argmax(axis=1))
+        leftest = self._left + self._offX[games] + H_PITCH*live.argmax(axis=1)
+        right = self._right[games]
+        walk_right = right & (rightest + ALIEN_H_WALK <= GAME_WIDTH - (ALIEN_WIDTH/2 + ALIEN_H_SEP))
+        walk_left = ~right & (leftest - ALIEN_H_WALK >= ALIEN_WIDTH/2 + ALIEN_H_SEP)
+        drop = ~(walk_right | walk_left)
+        self._offX[games[walk_right]] += ALIEN_H_WALK
+        self._offX[games[walk_left]] -= ALIEN_H_WALK
+        self._offY[games[drop]] -= ALIEN_V_WALK
+        self._right[games[drop]] = ~right[drop]
+
+        self._stepsToFire[games] -= 1
+        for k in (self._stepsToFire[games] == 0).nonzero()[0]:
+            self._fire(games[k], live[k])
+        self._time[games] -= self._waveSpeed[games]
+
+    def _fire(self, game, live):
+        """
+        Fires a bolt from a random bottom alien of one game.
+
+        Parameter game: the game that fires
+        Precondition: game is an int in 0..N-1 with at least one live alien
+
+        Parameter live: whether each column of the game has a live alien
+        Precondition: live is a bool array of length cols
+        """
+        rng = self._randoms[game]
+        col = rng.choice(live.nonzero()[0].tolist())
+        row = int(self._alive[game,:,col].argmax())
+        free = ~self._bUsed[game]
+        slot = int(free.argmax())
+        if free[slot]:
+            self._bx[game,slot] = self._left + self._offX[game] + H_PITCH*col
+            self._by[game,slot] = (self._bottom + self._offY[game] + V_PITCH*row
+                                   - ALIEN_HEIGHT/2 - BOLT_HEIGHT/2)
+            self._bUsed[game,slot] = True
+        self._stepsToFire[game] = rng.randint(1,BOLT_RATE)
+
+    def _boltsController(self, active):
+        """
+        Moves the bolts and resolves their collisions with the aliens and the ships.
+
+        Each player bolt can only reach the two nearest rows and the two nearest
+        columns of its block, so those four cells are tested (in row-major order, as
+        Formation.findHit does) for every game at once.
+
+        Parameter active: whether each game is still running
+        Precondition: active is a bool array of length N
+        """
+        self._py[active & self._pUsed] += self._boltSpeed
+        self._by[active[:,None] & self._bUsed] -= self._boltSpeed
+
+        # Player bolts against the aliens
+        games = (active & self._pUsed).nonzero()[0]
+        if len(games):
+            rows, cols = self._alive.shape[1:]
+            px = self._px[games]
+            py = self._py[games]
+            left = self._left + self._offX[games]
+            bottom = self._bottom + self._offY[games]
+            col0 = np.floor((px-left)/H_PITCH).astype(np.int64)
+            row0 = np.floor((py-bottom)/V_PITCH).astype(np.int64)
+            hit = np.zeros(len(games), dtype=np.bool_)
+            hitRow = np.zeros(len(games), dtype=np.int64)
+            hitCol = np.zeros(len(games), dtype=np.int64)
+            for dr, dc in ((0,0), (0,1), (1,0), (1,1)):
+                row = row0+dr
+                col = col0+dc
+                ok = ~hit & (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+                ok[ok] = self._alive[games[ok], row[ok], col[ok]]
+                ok &= ((np.abs(left + H_PITCH*col - px) < (ALIEN_WIDTH+BOLT_WIDTH)/2) &
+                       (np.abs(bottom + V_PITCH*row - py) < (ALIEN_HEIGHT+BOLT_HEIGHT)/2))
+                hit |= ok
+                hitRow[ok] = row[ok]
+                hitCol[ok] = col[ok]
+            if hit.any():
+                won = games[hit]
+                row = hitRow[hit]
+                self._alive[won, row, hitCol[hit]] = False
+                self._aliveCount[won] -= 1
+                self._score[won] += (row+1)*ALIEN_POINTS
+                self._waveSpeed[won] *= ALIEN_ACCELERATION
+                self._pUsed[won] = False
+
+        # Alien bolts against the ships
+        ship = active & ~np.isnan(self._shipX)
+        hits = (self._bUsed & ship[:,None] &
+                (np.abs(self._bx - self._shipX[:,None]) < (BOLT_WIDTH+SHIP_WIDTH)/2) &
+                (np.abs(self._by - (SHIP_BOTTOM + SHIP_HEIGHT/2)) < (BOLT_HEIGHT+SHIP_HEIGHT)/2))
+        blasted = hits.any(axis=1).nonzero()[0]
+        if len(blasted):
+            self._bUsed[blasted, hits[blasted].argmax(axis=1)] = False
+            self._shipX[blasted] = np.nan
+            self._lives[blasted] -= 1
+
+        # Culling
+        self._pUsed &= ~((self._py-BOLT_HEIGHT/2 >= GAME_HEIGHT) | (self._py+BOLT_HEIGHT/2 <= 0))
+        self._bUsed &= ~((self._by-BOLT_HEIGHT/2 >= GAME_HEIGHT) | (self._by+BOLT_HEIGHT/2 <= 0))
+
+    def _checkOutcomes(self):
+        """
+        Marks the games that were won or lost on this tick as over.
+
+        A game is won when every alien is destroyed.  It is lost when the ship is
+        destroyed with no lives left, or when a live alien reaches the defense line.
+        """
+        running = ~self._done
+        won = running & (self._aliveCount == 0)
+        rows = self._alive.any(axis=2)
+        lowest = self._bottom + self._offY + V_PITCH*rows.argmax(axis=1)
+        lost = running & ~won & ((np.isnan(self._shipX) & (self._lives == 0)) |
+                                 (rows.any(axis=1) & (lowest-ALIEN_HEIGHT/2 <= DEFENSE_LINE)))
+        self._won |= won
+        self._done |= won | lost
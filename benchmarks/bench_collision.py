@@ -0,0 +1,80 @@
+"""
+Benchmark for the bolt collision test of GObject.overlaps
+
+This script times the old collision test (four calls to GObject.contains with the
+corners of the bolt) against the analytic test GObject.overlaps.  It also checks that
+both tests agree on ordinary bolts, and that only the new test catches a bolt that is
+wider than its target.
+
+The shapes are plain GRectangles with no colour, so that the script does not need a
+window.  Run it from the top-level folder of the game:
+
+    python benchmarks/bench_collision.py
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timeit
+from consts import *
+from game2d import GRectangle
+
+
+def corner_collides(target, bolt):
+    """
+    Returns: True if a corner of bolt is inside target (the old collision test)
+
+    Parameter target: the ship or alien to check
+    Precondition: target is a GObject
+
+    Parameter bolt: the laser bolt to check
+    Precondition: bolt is a GObject
+    """
+    x1 = bolt.x - BOLT_WIDTH/2
+    x2 = bolt.x + BOLT_WIDTH/2
+    y1 = bolt.y - BOLT_HEIGHT/2
+    y2 = bolt.y + BOLT_HEIGHT/2
+    return (target.contains((x1, y1)) or target.contains((x1,y2)) or
+            target.contains((x2,y1)) or target.contains((x2,y2)))
+
+
+def check(target):
+    """
+    Checks that the two tests agree on a sweep of bolt positions around target.
+
+    Parameter target: the alien to test against
+    Precondition: target is a GRectangle of size ALIEN_WIDTH x ALIEN_HEIGHT
+    """
+    bolt = GRectangle(x=0, y=0, width=BOLT_WIDTH, height=BOLT_HEIGHT)
+    for dx in range(-30, 31):
+        for dy in range(-30, 31, 3):
+            bolt.x = target.x+dx
+            bolt.y = target.y+dy
+            assert corner_collides(target, bolt) == target.overlaps(bolt), (dx, dy)
+
+    wide = GRectangle(x=target.x, y=target.y, width=ALIEN_WIDTH*3, height=BOLT_HEIGHT)
+    assert target.overlaps(wide)
+    assert not any(target.contains(p) for p in ((wide.left, wide.bottom),
+            (wide.left, wide.top), (wide.right, wide.bottom), (wide.right, wide.top)))
+
+
+def main(number=100000):
+    """
+    Runs the benchmark and prints the time per call of each test.
+
+    Parameter number: the number of calls to time for each test
+    Precondition: number is an int > 0
+    """
+    target = GRectangle(x=400, y=400, width=ALIEN_WIDTH, height=ALIEN_HEIGHT)
+    check(target)
+
+    hit  = GRectangle(x=405, y=390, width=BOLT_WIDTH, height=BOLT_HEIGHT)
+    miss = GRectangle(x=100, y=100, width=BOLT_WIDTH, height=BOLT_HEIGHT)
+    for name, bolt in (('hit', hit), ('miss', miss)):
+        old = min(timeit.repeat(lambda: corner_collides(target, bolt), number=number, repeat=3))
+        new = min(timeit.repeat(lambda: target.overlaps(bolt), number=number, repeat=3))
+        print('%-5s corners: %6.3f us   overlaps: %6.3f us   speedup: %5.1fx'
+              % (name, 1e6*old/number, 1e6*new/number, old/new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of color parsing and of the construction of colored objects
+
+Every GObject with a fillcolor or linecolor parses its color when it is made.  The
+colors are interned (see game2d.gobject.parse_color), so only the first object with a
+given color pays for parsing it.  This script times both cases:
+
+    parse/cold/COLOR:  parse_color with an empty cache, which is the cost of parsing
+    parse/warm/COLOR:  parse_color with the color already in the cache
+
+and, with --render, the construction of a Bolt (fillcolor 'red') and of a GLabel
+(linecolor 'yellow') in a real game window, again with a cold and a warm cache.  The
+cold numbers are the cost before colors were interned.
+
+Run it from the top-level folder of the game:
+
+    python benchmarks/bench_colors.py
+    python benchmarks/bench_colors.py --render --output colors.json
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import platform
+from bench_wave import timeAll
+
+
+#: the color specifications to parse, one of each kind
+COLORS = {'name': 'red', 'web': '#ffff00', 'rgb': (0.0, 0.5, 1.0), 'rgba': [1, 1, 1, 0.5]}
+
+
+def parseTimers():
+    """
+    Returns a dictionary of the (setup, frame) functions of every parsing metric.
+    """
+    from game2d.gobject import parse_color, COLOR_CACHE
+    timers = {}
+    for name, color in COLORS.items():
+        timers['parse/cold/'+name] = (lambda: None,
+            lambda state, color=color: (COLOR_CACHE.clear(), parse_color(color)))
+        timers['parse/warm/'+name] = (lambda color=color: parse_color(color),
+            lambda state, color=color: parse_color(color))
+    return timers
+
+
+def renderMetrics(frames, repeat):
+    """
+    Returns a dictionary of the construction metrics, in seconds per object.
+
+    This opens a game window (it needs a display and OpenGL), times every metric in it
+    and closes it again.
+
+    Parameter frames: the number of objects made in a run
+    Precondition: frames is an int > 0
+
+    Parameter repeat: the number of runs of each metric
+    Precondition: repeat is an int > 0
+    """
+    import kivy.app
+    from consts import GAME_WIDTH, GAME_HEIGHT, FONT
+    from game2d import GameApp, GLabel
+    from game2d.gobject import COLOR_CACHE
+    from models import Bolt
+
+    metrics = {}
+    makers = {'bolt': lambda: Bolt(100, 100, 1),
+              'label': lambda: GLabel(text='Score: 0', font_size=30, x=90, y=680,
+                                      linecolor='yellow', font_name=FONT)}
+
+    class ColorBench(GameApp):
+        def start(self):
+            timers = {}
+            for name, make in makers.items():
+                timers[name+'/cold'] = (lambda: None,
+                    lambda state, make=make: (COLOR_CACHE.clear(), make()))
+                timers[name+'/warm'] = (make, lambda state, make=make: make())
+            metrics.update(timeAll(timers, frames, repeat))
+            # GameApp.stop exits Python, so stop the Kivy app only
+            kivy.app.App.stop(self)
+
+    ColorBench(width=GAME_WIDTH, height=GAME_HEIGHT).run()
+    return metrics
+
+
+def main():
+    """
+    Runs the benchmark from the command line.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='Time color parsing and the '+
+                                     'construction of colored objects.')
+    parser.add_argument('--frames', type=int, default=200, help='calls per run')
+    parser.add_argument('--repeat', type=int, default=25, help='runs per metric')
+    parser.add_argument('--render', action='store_true',
+                        help='also time Bolt and GLabel construction (needs a window)')
+    parser.add_argument('--output', help='the file to write the results to')
+    args = parser.parse_args()
+
+    metrics = timeAll(parseTimers(), args.frames, args.repeat)
+    if args.render:
+        metrics.update(renderMetrics(args.frames, args.repeat))
+
+    for name, value in sorted(metrics.items()):
+        print('%-22s %10.2f us' % (name, 1e6*value))
+    print()
+    for name in sorted(metrics):
+        if '/cold' in name:
+            warm = metrics[name.replace('/cold', '/warm')]
+            print('%-22s %6.1fx faster when interned' %
+                  (name.replace('/cold', ''), metrics[name]/warm))
+
+    if args.output:
+        results = {'python': platform.python_version(), 'machine': platform.machine(),
+                   'frames': args.frames, 'repeat': args.repeat, 'metrics': metrics}
+        with open(args.output, 'w') as file:
+            file.write(json.dumps(results, indent=2, sort_keys=True)+'\n')
+
+
+if __name__ == '__main__':
+    main()
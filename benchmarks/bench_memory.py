@@ -0,0 +1,123 @@
+"""
+Benchmark of the memory used by one game object
+
+A formation or a storm of bolts can hold hundreds of game objects at once, so the
+size of a single object matters.  This script makes many objects of each kind and
+reports the memory they take, in bytes per object, as measured by tracemalloc:
+
+    gobject:  a bare GObject at a position, with a size (no drawing cache)
+    rotated:  the same, rotated by 30 degrees
+    scene:    an empty GScene (with its drawing cache)
+
+and, with --render, a Bolt, a Ship and a GRectangle in a real game window, as these
+build drawing instructions that need OpenGL.  The numbers include the Kivy instructions
+that belong to the object, but not shared data like textures.
+
+Run it from the top-level folder of the game:
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --render --output memory.json
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import json
+import platform
+import tracemalloc
+
+
+def measure(make, count):
+    """
+    Returns the memory in bytes of one object made by make.
+
+    The objects are all kept alive until they are measured, and the memory is taken
+    as the growth of the traced memory over count objects.
+
+    Parameter make: the function that makes an object
+    Precondition: make is a function with no arguments
+
+    Parameter count: the number of objects to make
+    Precondition: count is an int > 0
+    """
+    make()      # Anything made once (caches, interned colors) is not counted
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list that holds the objects is not part of them
+    return (after-before-sys.getsizeof(objects))/count
+
+
+def plainMakers():
+    """
+    Returns a dictionary of the functions that make each object without a window.
+    """
+    from game2d import GObject, GScene
+    return {'gobject': lambda: GObject(x=100, y=100, width=33, height=33),
+            'rotated': lambda: GObject(x=100, y=100, width=33, height=33, angle=30),
+            'scene':   lambda: GScene(x=100, y=100)}
+
+
+def renderMetrics(count):
+    """
+    Returns a dictionary of the memory of the drawn objects, in bytes per object.
+
+    This opens a game window (it needs a display and OpenGL), measures every object in
+    it and closes it again.
+
+    Parameter count: the number of objects of each kind to make
+    Precondition: count is an int > 0
+    """
+    import kivy.app
+    from consts import GAME_WIDTH, GAME_HEIGHT
+    from game2d import GameApp, GRectangle
+    from models import Bolt, Ship
+
+    metrics = {}
+    makers = {'bolt': lambda: Bolt(100, 100, 1),
+              'ship': lambda: Ship(),
+              'rectangle': lambda: GRectangle(x=100, y=100, width=10, height=10,
+                                              fillcolor='red')}
+
+    class MemoryBench(GameApp):
+        def start(self):
+            for name, make in makers.items():
+                metrics[name] = measure(make, count)
+            # GameApp.stop exits Python, so stop the Kivy app only
+            kivy.app.App.stop(self)
+
+    MemoryBench(width=GAME_WIDTH, height=GAME_HEIGHT).run()
+    return metrics
+
+
+def main():
+    """
+    Runs the benchmark from the command line.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='Measure the memory of one game object.')
+    parser.add_argument('--count', type=int, default=2000, help='objects of each kind')
+    parser.add_argument('--render', action='store_true',
+                        help='also measure Bolt, Ship and GRectangle (needs a window)')
+    parser.add_argument('--output', help='the file to write the results to')
+    args = parser.parse_args()
+
+    metrics = dict((name, measure(make, args.count)) for name, make in plainMakers().items())
+    if args.render:
+        metrics.update(renderMetrics(args.count))
+
+    for name, value in sorted(metrics.items()):
+        print('%-12s %8.0f bytes' % (name, value))
+
+    if args.output:
+        results = {'python': platform.python_version(), 'machine': platform.machine(),
+                   'count': args.count, 'metrics': metrics}
+        with open(args.output, 'w') as file:
+            file.write(json.dumps(results, indent=2, sort_keys=True)+'\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+"""
+Benchmark suite for the cost of a wave per frame
+
+This script times one frame of a wave across grid sizes (from a single alien up to
+the 10x15 maximum of the game and beyond) and across the number of bolts on screen.
+The tracked metrics are the seconds per frame of
+
+    update:  WaveEngine.update with a 60 fps frame (two simulation ticks)
+    bolts:   WaveEngine._boltsController (one tick)
+    aliens:  WaveEngine._alienController, with an alien step on every call
+
+and, with --render, of Wave.update and Wave.draw in a real game window.  Every metric
+is the best of several runs, each on a fresh wave, to keep the noise of the machine
+out of the numbers.
+
+The results are written as JSON.  If a baseline is given (by default the file
+baseline.json next to this script, if it exists), every metric is compared to it, and
+the script exits with status 1 if any metric is slower than the baseline by more than
+the threshold.  Baselines are only meaningful on the machine that recorded them, so
+record a new one (with --save-baseline) before comparing on another machine.
+
+Even the best of 25 runs moves by 30% or more from one run of the suite to the next
+on a busy machine, as the clock speed of the processor changes.  So a metric that
+looks slower is not reported at once.  It is timed again (with the calibration) up
+to --retries more times.  Each retry is scaled by its own calibration time to the
+speed of the machine in the first run, and the best time is kept.  A metric
+is only reported as a regression if it is still slower after the last retry.  A
+passing noise spike goes away in the retries, but a real slow down does not.  The
+retries only time the engine metrics again; the --render metrics are compared once.
+
+Run it from the top-level folder of the game:
+
+    python benchmarks/bench_wave.py --output results.json
+    python benchmarks/bench_wave.py --save-baseline
+    python benchmarks/bench_wave.py --render
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import json
+import platform
+import random
+import time
+import numpy as np
+from consts import *
+from engine import WaveEngine, newSwarm
+
+
+#: the grid sizes (rows, aliens per row) to time; 10x15 is the largest game grid
+GRIDS = ((1,1), (5,12), (10,15), (20,30), (40,60))
+#: the numbers of alien bolts on screen to time
+BOLTS = (0, 16, 64, 256, 1024)
+#: the (rows, cols, bolts) cases: the grid sweep with no bolts, then the bolt sweep
+CASES = tuple((rows, cols, 0) for rows, cols in GRIDS) + tuple((5, 12, n) for n in BOLTS if n)
+#: the baseline compared against by default
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+#: the input for every frame: move right and fire
+INPUT = (True, False, True)
+
+
+def loadBolts(engine, count, seed=0):
+    """
+    Fires count alien bolts high on the screen of an engine.
+
+    The bolts start high enough that none of them reaches the ship or leaves the
+    screen within a benchmark run, so the count stays the same from frame to frame.
+
+    Parameter engine: the engine to load
+    Precondition: engine is a WaveEngine with room for count more bolts
+
+    Parameter count: the number of bolts to fire
+    Precondition: count is an int >= 0
+
+    Parameter seed: the seed for the bolt positions
+    Precondition: seed is an int
+    """
+    rng = random.Random(seed)
+    pool = engine.getBolts()
+    vel = BOLT_SPEED*FRAME_RATE/SIM_RATE
+    for _ in range(count):
+        pool.fire(rng.uniform(0, GAME_WIDTH), rng.uniform(GAME_HEIGHT*2/3, GAME_HEIGHT), -vel)
+
+
+def newEngine(rows, cols, bolts):
+    """
+    Returns a new seeded engine with a grid of rows x cols aliens and bolts bolts.
+
+    Parameter rows, cols: the size of the grid
+    Precondition: rows, cols are ints > 0
+
+    Parameter bolts: the number of alien bolts on screen
+    Precondition: bolts is an int >= 0
+    """
+    engine = WaveEngine(seed=0, rows=rows, cols=cols, capacity=bolts+8)
+    loadBolts(engine, bolts)
+    return engine
+
+
+def timeRun(setup, frame, frames):
+    """
+    Returns the time in seconds per frame of one run of frames frames.
+
+    Parameter setup: a function that returns a fresh state for the run
+    Precondition: setup is a function with no arguments
+
+    Parameter frame: a function that runs one frame on the state
+    Precondition: frame is a function of one argument
+
+    Parameter frames: the number of frames in the run
+    Precondition: frames is an int > 0
+    """
+    state = setup()
+    # Like timeit, keep the garbage collector out of the timed frames
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame(state)
+        return (time.perf_counter()-start)/frames
+    finally:
+        gc.enable()
+
+
+def timeAll(timers, frames, repeat):
+    """
+    Returns a dictionary of the best time in seconds per frame of every timer.
+
+    The runs are interleaved: each of the repeat rounds runs every timer once.  A
+    slow spell of the machine then hits every metric alike, instead of all the runs
+    of whichever metric was being timed at that moment.
+
+    Parameter timers: the (setup, frame) functions of each metric, by name
+    Precondition: timers is a dictionary of str to pairs of functions (see timeRun)
+
+    Parameter frames: the number of frames in a run
+    Precondition: frames is an int > 0
+
+    Parameter repeat: the number of runs of each metric
+    Precondition: repeat is an int > 0
+    """
+    best = {}
+    for _ in range(repeat):
+        for name, (setup, frame) in timers.items():
+            elapsed = timeRun(setup, frame, frames)
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+
+def calibration():
+    """
+    Returns the (setup, frame) functions of a fixed reference workload.
+
+    The workload mixes plain Python (a loop of arithmetic and list calls) with small
+    NumPy operations, like a frame of the engine.  Comparisons divide every metric by
+    its time, so that a machine that is uniformly slower today (a busy host, a lower
+    clock) does not look like a regression.
+    """
+    def setup():
+        return [[], np.zeros(64)]
+    def frame(state):
+        total = 0.0
+        for k in range(50):
+            total += abs(k-25.5)*0.5
+        state[0].append(total)
+        state[0].pop()
+        state[1] += 1.0
+        return (state[1] > 10).any()
+    return (setup, frame)
+
+
+def engineTimers():
+    """
+    Returns a dictionary of the (setup, frame) functions of every engine metric.
+
+    The grid sweep runs with no bolts on screen, and the bolt sweep on the 5x12 grid
+    of the game.  Metric names have the form 'name/ROWSxCOLS/bBOLTS', except for the
+    swarm mode (see engine.newSwarm), whose metrics end in '/swarm'.
+    """
+    timers = {}
+    for rows, cols, bolts in CASES:
+        setup = lambda rows=rows, cols=cols, bolts=bolts: newEngine(rows, cols, bolts)
+        suffix = '/%dx%d/b%d' % (rows, cols, bolts)
+        timers['update'+suffix] = (setup,
+            lambda engine: engine.update(INPUT, 1.0/FRAME_RATE))
+        timers['bolts'+suffix] = (setup, lambda engine: engine._boltsController())
+        timers['aliens'+suffix] = (setup,
+            lambda engine: engine._alienController(ALIEN_SPEED))
+    timers['update/swarm'] = (lambda: newSwarm(seed=0),
+        lambda engine: engine.update(INPUT, 1.0/FRAME_RATE))
+    timers['aliens/swarm'] = (lambda: newSwarm(seed=0),
+        lambda engine: engine._alienController(ALIEN_SPEED))
+    return timers
+
+
+def renderMetrics(frames=30, repeat=25):
+    """
+    Returns a dictionary of the Wave.update and Wave.draw metrics, in seconds per frame.
+
+    This opens a game window (it needs a display and OpenGL), runs every case in it
+    and closes it again.  The draw metric includes clearing the view and updating
+    the canvas.  A Wave has the bolt pool of the game (BOLT_CAPACITY bolts), so the
+    cases with more bolts than fit in it are skipped.
+
+    Parameter frames: the number of frames in a run
+    Precondition: frames is an int > 0
+
+    Parameter repeat: the number of runs of each metric
+    Precondition: repeat is an int > 0
+    """
+    import kivy.app
+    from game2d import GameApp
+    from wave import Wave
+
+    metrics = {}
+
+    def newWave(rows, cols, bolts):
+        wave = Wave(rows, cols)
+        wave.setSound(False)
+        loadBolts(wave.getEngine(), bolts)
+        wave.update(INPUT, 0)
+        return wave
+
+    class RenderBench(GameApp):
+        def start(self):
+            timers = {}
+            for rows, cols, bolts in CASES:
+                # The Wave has the pool of the game, with room for 8 more bolts
+                if bolts > BOLT_CAPACITY-8:
+                    print('skipped the render cases with %d bolts (the pool holds %d)'
+                          % (bolts, BOLT_CAPACITY))
+                    continue
+                setup = lambda rows=rows, cols=cols, bolts=bolts: newWave(rows, cols, bolts)
+                suffix = '/%dx%d/b%d' % (rows, cols, bolts)
+                timers['wave.update'+suffix] = (setup,
+                    lambda wave: wave.update(INPUT, 1.0/FRAME_RATE))
+                timers['wave.draw'+suffix] = (setup,
+                    lambda wave: (self.view.clear(), wave.draw(self.view), self.view._commit()))
+            metrics.update(timeAll(timers, frames, repeat))
+            # GameApp.stop exits Python, so stop the Kivy app only
+            kivy.app.App.stop(self)
+
+    RenderBench(width=GAME_WIDTH, height=GAME_HEIGHT).run()
+    return metrics
+
+
+def compare(results, baseline, threshold, floor=2e-6):
+    """
+    Returns the list of (name, old, new) for the metrics that regressed.
+
+    The baseline metrics are first scaled by the ratio of the calibration times of the
+    two runs (see calibration).  A metric then regresses if it is slower than in the
+    scaled baseline by more than threshold (a fraction, so 0.25 allows 25% slower) and
+    by more than floor seconds.  The floor keeps the timer noise of the cheapest
+    metrics (about a microsecond) from failing the suite.  Metrics missing from either
+    side are not compared.
+
+    Parameter results: the new results
+    Precondition: results is a results dictionary (see main)
+
+    Parameter baseline: the results to compare against
+    Precondition: baseline is a results dictionary (see main)
+
+    Parameter threshold: the allowed slow down
+    Precondition: threshold is a number >= 0
+
+    Parameter floor: the smallest slow down in seconds that counts
+    Precondition: floor is a number >= 0
+    """
+    scale = results['calibration']/baseline['calibration']
+    old = dict((name, value*scale) for name, value in baseline['metrics'].items())
+    regressed = []
+    for name, new in sorted(results['metrics'].items()):
+        if name in old and new > old[name]*(1+threshold) and new-old[name] > floor:
+            regressed.append((name, old[name], new))
+    return regressed
+
+
+def writeResults(results, path):
+    """
+    Writes the results as JSON to the file path, if a path is given.
+
+    Parameter results: the results to write
+    Precondition: results is a results dictionary (see main)
+
+    Parameter path: the file to write
+    Precondition: path is a str or None
+    """
+    if path:
+        with open(path, 'w') as file:
+            file.write(json.dumps(results, indent=2, sort_keys=True)+'\n')
+
+
+def main():
+    """
+    Runs the benchmark suite from the command line.
+
+    Returns the exit status: 0 if no metric regressed, 1 otherwise.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='Time a wave per frame across grid '+
+                                     'sizes and bolt counts.')
+    parser.add_argument('--frames', type=int, default=30, help='frames per run')
+    parser.add_argument('--repeat', type=int, default=25, help='runs per metric')
+    parser.add_argument('--render', action='store_true',
+                        help='also time Wave.update and Wave.draw (needs a window)')
+    parser.add_argument('--output', help='the file to write the results to')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='the results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='the allowed slow down of a metric (0.25 is 25%%)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='the times to time a slower metric again before failing')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline instead of comparing')
+    args = parser.parse_args()
+
+    timers = engineTimers()
+    timers['calibration'] = calibration()
+    metrics = timeAll(timers, args.frames, args.repeat)
+    scale = metrics.pop('calibration')
+    if args.render:
+        metrics.update(renderMetrics(args.frames, args.repeat))
+    results = {'python': platform.python_version(), 'numpy': np.__version__,
+               'machine': platform.machine(), 'platform': platform.platform(),
+               'frames': args.frames, 'repeat': args.repeat, 'metrics': metrics,
+               'calibration': scale}
+
+    for name, value in sorted(metrics.items()):
+        print('%-28s %10.2f us' % (name, 1e6*value))
+    if args.save_baseline:
+        writeResults(results, args.output)
+        writeResults(results, args.baseline)
+        print('saved the baseline to %s' % args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        writeResults(results, args.output)
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressed = compare(results, baseline, args.threshold)
+    for _ in range(args.retries):
+        retry = dict((name, timers[name]) for name, old, new in regressed if name in timers)
+        if not retry:
+            break
+        retry['calibration'] = timers['calibration']
+        again = timeAll(retry, args.frames, args.repeat)
+        # Scale the retry to the calibration of the first run, as the clock may differ
+        ratio = scale/again.pop('calibration')
+        for name, value in again.items():
+            metrics[name] = min(metrics[name], value*ratio)
+        regressed = compare(results, baseline, args.threshold)
+    writeResults(results, args.output)
+
+    for name, old, new in regressed:
+        print('REGRESSION %-28s %10.2f us -> %10.2f us (%+.0f%%)'
+              % (name, 1e6*old, 1e6*new, 100*(new/old-1)))
+    if regressed:
+        return 1
+    print('no metric regressed by more than %.0f%%' % (100*args.threshold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Laser bolt storage for Alien Invaders
+
+This module contains the pool of laser bolts used by the headless engine.  Instead of
+a list of bolt objects, the pool keeps one NumPy array per attribute (x, y, velocity
+and whether the slot is in use), all of a fixed capacity, plus a free list of unused
+slots.  Firing a bolt takes a slot from the free list and expiring a bolt gives it
+back, so neither allocates anything and both are O(1).
+
+Because the bolts live in arrays, the work of a frame is a handful of array
+operations no matter how many bolts are on screen: moving every bolt, classifying
+player and alien bolts (by the sign of the velocity), testing every alien bolt
+against the ship, and culling every bolt that left the screen.  This matters in the
+bullet-heavy modes, where hundreds of alien bolts are on screen at once.
+
+Bolts never move between slots, and the lists of slots returned by the pool are
+snapshots.  A loop over the slots can therefore expire bolts as it goes without
+skipping any of their neighbours.
+
+Like engine.py, this module never imports game2d or Kivy.
+"""
+from consts import *
+import numpy as np
+
+
+class BoltPool(object):
+    """
+    A class representing a fixed number of slots for laser bolts.
+
+    A slot is either in use (it holds a bolt on screen) or free.  The data of the
+    bolt in slot i is _x[i], _y[i] and _vel[i]; bolts with a positive velocity were
+    fired by the player.  Free slots always have velocity 0, so that moving every
+    slot at once leaves them where they are.
+
+    INSTANCE ATTRIBUTES:
+        _capacity: the number of slots [int > 0]
+        _x:      the x-coordinate of the bolt in each slot [float array]
+        _y:      the y-coordinate of the bolt in each slot [float array]
+        _vel:    the velocity of the bolt in each slot [float array, 0 if free]
+        _used:   whether each slot holds a bolt [bool array]
+        _free:   the free slots, used as a stack [list of int]
+        _players: the number of player bolts in use [int >= 0]
+    """
+
+    # GETTERS AND SETTERS
+    def getCapacity(self):
+        """
+        Returns the number of slots in this pool.
+        """
+        return self._capacity
+
+    def getCount(self):
+        """
+        Returns the number of bolts in use.
+        """
+        return self._capacity-len(self._free)
+
+    def getPlayerCount(self):
+        """
+        Returns the number of player bolts in use.
+        """
+        return self._players
+
+    def getSlots(self):
+        """
+        Returns a list of the slots in use, in increasing order.
+
+        The list is a snapshot, so bolts may be expired while looping over it.
+        """
+        return self._used.nonzero()[0].tolist()
+
+    def getPlayerSlots(self):
+        """
+        Returns a list of the slots holding player bolts, in increasing order.
+
+        The list is a snapshot, so bolts may be expired while looping over it.
+        """
+        if self._players == 0:
+            return []
+        return (self._vel > 0).nonzero()[0].tolist()
+
+    def getArrays(self):
+        """
+        Returns the arrays (x, y, vel, used) of this pool.
+
+        The arrays are shared with this pool, so they should be treated as read-only.
+        """
+        return (self._x, self._y, self._vel, self._used)
+
+    def isUsed(self, slot):
+        """
+        Returns True if the slot holds a bolt; False otherwise.
+
+        Parameter slot: the slot to check
+        Precondition: slot is an int in 0..capacity-1
+        """
+        return bool(self._used[slot])
+
+    def getX(self, slot):
+        """
+        Returns the x-coordinate of the bolt in a slot.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..capacity-1
+        """
+        return float(self._x[slot])
+
+    def getY(self, slot):
+        """
+        Returns the y-coordinate of the bolt in a slot.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..capacity-1
+        """
+        return float(self._y[slot])
+
+    def getVel(self, slot):
+        """
+        Returns the velocity of the bolt in a slot.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..capacity-1
+        """
+        return float(self._vel[slot])
+
+    # INITIALIZER
+    def __init__(self, capacity=BOLT_CAPACITY):
+        """
+        Initializes a pool with every slot free.
+
+        Parameter capacity: the number of slots
+        Precondition: capacity is an int > 0
+        """
+        self._capacity = capacity
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._vel = np.zeros(capacity)
+        self._used = np.zeros(capacity, dtype=np.bool_)
+        self._free = list(range(capacity-1, -1, -1))
+        self._players = 0
+
+    # PUBLIC METHODS
+    def fire(self, x, y, vel):
+        """
+        Returns the slot of a new bolt, or -1 if every slot is in use.
+
+        Parameter x: the x-coordinate of the center of the bolt
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y-coordinate of the center of the bolt
+        Precondition: y is a number (int or float)
+
+        Parameter vel: the velocity of the bolt (positive for player bolts)
+        Precondition: vel is a nonzero number (int or float)
+        """
+        if not self._free:
+            return -1
+        slot = self._free.pop()
+        self._x[slot] = x
+        self._y[slot] = y
+        self._vel[slot] = vel
+        self._used[slot] = True
+        if vel > 0:
+            self._players += 1
+        return slot
+
+    def expire(self, slot):
+        """
+        Removes the bolt in a slot, making the slot free.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int in 0..capacity-1 that is in use
+        """
+        if self._vel[slot] > 0:
+            self._players -= 1
+        self._used[slot] = False
+        self._vel[slot] = 0
+        self._free.append(slot)
+
+    def advance(self):
+        """
+        Moves every bolt by its velocity.
+        """
+        self._y += self._vel
+
+    def findHit(self, x, y, width, height):
+        """
+        Returns the first slot with an alien bolt overlapping a rectangle, or -1.
+
+        Parameter x, y: the center of the rectangle
+        Precondition: x, y are numbers (int or float)
+
+        Parameter width, height: the size of the rectangle
+        Precondition: width, height are numbers (int or float) >= 0
+        """
+        if self._players == self.getCount():
+            return -1
+        hits = ((self._vel < 0) &
+                (np.abs(self._x-x) < (BOLT_WIDTH+width)/2) &
+                (np.abs(self._y-y) < (BOLT_HEIGHT+height)/2))
+        slot = int(hits.argmax())
+        return slot if hits[slot] else -1
+
+    def cull(self):
+        """
+        Expires every bolt that has left the screen.
+        """
+        if len(self._free) == self._capacity:
+            return
+        gone = self._used & ((self._y-BOLT_HEIGHT/2 >= GAME_HEIGHT) |
+                             (self._y+BOLT_HEIGHT/2 <= 0))
+        if not gone.any():
+            return
+        slots = gone.nonzero()[0]
+        self._players -= int(np.count_nonzero(self._vel[slots] > 0))
+        self._used[slots] = False
+        self._vel[slots] = 0
+        self._free.extend(slots.tolist())
@@ -9,7 +9,6 @@ Author: Antony Kariuki, akk85
 Date Completed: 12/03/2021
 """
 import introcs
-import sys
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
 
@@ -65,6 +64,21 @@ ALIEN_IMAGES   = ('alien1.png','alien2.png','alien3.png')
 ALIEN_SPEED = 1.0
 
 
+### SWARM CONSTANTS (the stress test mode with tens of thousands of aliens) ###
+
+# the number of rows of aliens in swarm mode
+SWARM_ROWS    = 80
+# the number of aliens per row in swarm mode
+SWARM_IN_ROW  = 128
+# the width and height of an alien in swarm mode
+SWARM_SIZE    = 4
+# the horizontal and vertical separation between aliens in swarm mode
+SWARM_SEP     = 1
+# the colors of the swarm aliens (bottom to top), as RGBA bytes
+SWARM_COLORS  = ((0, 255, 0, 255), (0, 255, 255, 255), (255, 0, 255, 255))
+# whether the game is played in swarm mode (set from the command line)
+SWARM_MODE    = False
+
 ### BOLT CONSTANTS ###
 
 # the width of a laser bolt
@@ -76,6 +90,8 @@ BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
 BOLT_UP = 10
+# the most bolts (player and alien) that can be on screen at once
+BOLT_CAPACITY = 64
 
 ### GAME CONSTANTS ###
 
@@ -92,6 +108,13 @@ STATE_CONTINUE = 4
 #: state when the game is complete (won or lost)
 STATE_COMPLETE = 5
 
+# the frame rate that the per-update movement constants (SHIP_MOVEMENT, BOLT_SPEED) assume
+FRAME_RATE = 60
+# the number of fixed simulation ticks per second in the wave engine
+SIM_RATE = 120
+# the most time (in seconds) the wave engine will catch up on in a single update
+SIM_MAX_LAG = 0.25
+
 
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
 """
@@ -100,40 +123,84 @@ everything after the word python. So if you start the game typing
 
     python invaders 3 4 0.5
 
-Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take advantage of
-this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED.
+Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. The script __main__.py passes
+these arguments to readConfig below, and uses the result to change the constants
+ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED before the game starts.
+
+This used to happen here, when this module was imported.  That tied every wave in a
+process to a single configuration (and let the arguments of any other script, like the
+wave farm, change the game).  Headless waves now take their configuration as arguments,
+and only the game itself reads sys.argv.
 """
-try:
-    rows = int(sys.argv[1])
-    if rows >= 1 and rows <= 10:
-        ALIEN_ROWS = rows
-except:
-    pass # Use original value
-
-try:
-    perrow = int(sys.argv[2])
-    if perrow >= 1 and perrow <= 15:
-        ALIENS_IN_ROW = perrow
-except:
-    pass # Use original value
-
-try:
-    speed = float(sys.argv[3])
-    if speed >= 0 and speed <= 3:
-        ALIEN_SPEED = speed
-except:
-    pass # Use original value
+def readConfig(args):
+    """
+    Returns the tuple (rows, perrow, speed) given by a list of command line arguments.
+
+    The arguments are the number of rows of aliens (1..10), the number of aliens per row
+    (1..15) and the seconds between alien steps (0..3), in that order.  Any argument
+    that is missing or invalid keeps the value of ALIEN_ROWS, ALIENS_IN_ROW or
+    ALIEN_SPEED.
+
+    Parameter args: the command line arguments (without the script name)
+    Precondition: args is a list of str
+    """
+    rows, perrow, speed = ALIEN_ROWS, ALIENS_IN_ROW, ALIEN_SPEED
+    try:
+        value = int(args[0])
+        if value >= 1 and value <= 10:
+            rows = value
+    except:
+        pass # Use original value
+
+    try:
+        value = int(args[1])
+        if value >= 1 and value <= 15:
+            perrow = value
+    except:
+        pass # Use original value
+
+    try:
+        value = float(args[2])
+        if value >= 0 and value <= 3:
+            speed = value
+    except:
+        pass # Use original value
+    return (rows, perrow, speed)
+
+
+def readSwarm(args):
+    """
+    Returns True if a list of command line arguments asks for swarm mode.
+
+    Swarm mode is asked for with the argument 'swarm', as in
+
+        python invaders swarm
+
+    Parameter args: the command line arguments (without the script name)
+    Precondition: args is a list of str
+    """
+    return 'swarm' in args
 
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
 
 # The alternate images to use in the filmstrip
 SHIP_IMAGE    = 'ship-strip.png'
+# The rows and columns of frames in the ship filmstrip
+SHIP_FORMAT   = (2,3)
+# The frames of the ship filmstrip shown as it explodes (over DEATH_SPEED seconds)
+SHIP_DEATH    = (1,2,3,4,5)
 
 #color of the bolts
 BOLT_COLOR = 'red'
 
 # The alternate images to use in the filmstrip
-#ALIEN_IMAGES   = ('alien-strip1.png','alien-strip2.png','alien-strip3.png')
+ALIEN_IMAGES   = ('alien-strip1.png','alien-strip2.png','alien-strip3.png')
+# The rows and columns of frames in an alien filmstrip
+ALIEN_FORMAT   = (3,2)
+# The frames of an alien filmstrip shown as the aliens walk (looped)
+ALIEN_WALK     = (0,1)
+# The number of seconds that each frame of the alien walk is shown
+ALIEN_WALK_SPEED = 0.5
 # The number of (base) points each alien is worth.  Multiplied by row
 ALIEN_POINTS = 10
 # The speed up factor for each alien killed.
@@ -0,0 +1,503 @@
+"""
+Headless simulation engine for Alien Invaders
+
+This module contains the rules of a single wave of Alien Invaders, written against
+plain Python data instead of GObjects.  It never imports game2d (and therefore never
+imports Kivy), so a wave can be stepped on a machine without a window or a sound card.
+This is what we use for bots, regression runs and load tests.
+
+The visible game uses exactly the same rules.  The class Wave in wave.py owns a
+WaveEngine and is only a thin render adapter: it forwards the input to the engine and
+then copies the engine state into the Ship and Bolt models and the alien batch that it
+draws.
+
+Anything that would make noise is reported as an event (one of the EVENT constants
+below).  It is up to the caller to decide whether to play a sound for it.
+
+By default the engine runs on a fixed timestep of SIM_RATE ticks per second.  Each
+call to update adds the frame time to an accumulator and runs as many whole ticks as
+fit, so the speed of the game (and the cost of the simulation) no longer depends on
+the display frame rate.  Leftover time carries over to the next frame.
+
+Every engine owns its own random number generator, created from a seed.  In
+fixed-timestep mode the engine also records the input of every tick in a compact
+log (one byte per tick).  Since a tick depends only on its input, replaying the seed
+and the log (see the function replay) reproduces the exact score and outcome of a
+game, as fast as the machine can run it.  We use this to verify scores and to bisect
+performance regressions.
+
+The function newSwarm creates a wave in swarm mode: a stress test with more than ten
+thousand tiny aliens.  It follows the same rules, and costs about the same per tick
+as the normal game, because no part of a tick does work per alien in the grid.
+"""
+from consts import *
+from formation import Formation
+from bolts import BoltPool
+import random
+
+
+# The events reported by WaveEngine.popEvents()
+#: an alien was destroyed by a player bolt
+EVENT_POP = 'pop'
+#: the ship was destroyed by an alien bolt
+EVENT_BLAST = 'blast'
+#: the ship fired a bolt
+EVENT_SHIP_PEW = 'pewShip'
+#: an alien fired a bolt
+EVENT_ALIEN_PEW = 'pewAlien'
+
+# The bits of a tick in the input log
+#: the right key was down
+INPUT_RIGHT = 1
+#: the left key was down
+INPUT_LEFT = 2
+#: the fire key was down
+INPUT_FIRE = 4
+#: a new ship was placed (with setShip) before this tick
+INPUT_RESPAWN = 8
+
+# The outcomes reported by WaveEngine.getOutcome()
+#: the player destroyed every alien
+OUTCOME_WIN = 'win'
+#: the player ran out of lives, or the aliens reached the defense line
+OUTCOME_LOSE = 'lose'
+
+
+def replay(seed, log, rate=SIM_RATE, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW,
+           speed=ALIEN_SPEED):
+    """
+    Returns a new WaveEngine after replaying an input log from the start of a wave.
+
+    The configuration (rate, rows, cols and speed) must be that of the recorded wave.
+
+    Parameter seed: the seed of the recorded wave
+    Precondition: seed is an int
+
+    Parameter log: the input log of the recorded wave (see WaveEngine.getLog)
+    Precondition: log is a bytes-like sequence of INPUT bit masks
+
+    Parameter rate: the number of ticks per second of the recorded wave
+    Precondition: rate is an int > 0
+
+    Parameter rows, cols: the size of the block of aliens of the recorded wave
+    Precondition: rows, cols are ints > 0
+
+    Parameter speed: the initial seconds between alien steps of the recorded wave
+    Precondition: speed is a number > 0
+    """
+    engine = WaveEngine(rate, seed, rows=rows, cols=cols, speed=speed)
+    engine.replay(log)
+    return engine
+
+
+def newSwarm(rate=SIM_RATE, seed=None):
+    """
+    Returns a new WaveEngine in swarm mode.
+
+    The block has SWARM_ROWS rows of SWARM_IN_ROW aliens, each a square of SWARM_SIZE
+    pixels, SWARM_SEP pixels apart.
+
+    Parameter rate: the number of fixed simulation ticks per second
+    Precondition: rate is an int > 0, or None
+
+    Parameter seed: the seed for the random number generator (None picks one)
+    Precondition: seed is an int, or None
+    """
+    return WaveEngine(rate, seed, rows=SWARM_ROWS, cols=SWARM_IN_ROW, width=SWARM_SIZE,
+                      height=SWARM_SIZE, hsep=SWARM_SEP, vsep=SWARM_SEP)
+
+
+class WaveEngine(object):
+    """
+    This class simulates a single wave of Alien Invaders on plain data.
+
+    It follows the same rules as the visible game: the ship moves and fires according
+    to the user input, the aliens march back and forth and drop one row at each wall,
+    and a random bottom alien fires every few alien steps.  Nothing in this class
+    knows how to draw itself.
+
+    INSTANCE ATTRIBUTES:
+        _shipX:  the x-coordinate of the ship [number, or None if destroyed]
+        _aliens: the block of aliens in the wave [Formation]
+        _bolts:  the laser bolts on screen [BoltPool]
+        _lives:  the number of lives left [int >= 0]
+        _time:   the amount of time since the last alien step [number >= 0]
+        _direction: the current direction of the wave [str; 'left' or 'right']
+        _stepsToFire: the number of steps before an alien fires a bolt [int > 0]
+        _waveSpeed: the number of seconds between alien steps [float > 0]
+        _score:  the current score of the player [int >= 0]
+        _events: the events since the last call to popEvents [list of EVENT str]
+        _rate:   the ticks per second [int > 0, or None to tick once per update]
+        _lag:    the frame time not yet simulated [0 <= float < 1/_rate]
+        _ticks:  the number of ticks simulated so far [int >= 0]
+        _shipSpeed: the pixels the ship moves per tick [number > 0]
+        _boltSpeed: the pixels a bolt moves per tick [number > 0]
+        _seed:   the seed of the random number generator [int]
+        _random: the random number generator of this wave [random.Random]
+        _log:    the input of every tick [bytearray, or None in variable-step mode]
+        _respawned: whether setShip was called since the last tick [bool]
+        _hWalk:  the pixels the aliens move on a march step [number > 0]
+        _vWalk:  the pixels the aliens move on a drop step [number > 0]
+        _margin: the closest an alien center gets to a wall [number > 0]
+    """
+
+    # GETTERS AND SETTERS
+    def getLives(self):
+        """
+        Returns the number of the player's lives left.
+        """
+        return self._lives
+
+    def getScore(self):
+        """
+        Returns the player's score.
+        """
+        return self._score
+
+    def getAliensLeft(self):
+        """
+        Returns the number of aliens left.
+        """
+        return self._aliens.getAliveCount()
+
+    def getShipX(self):
+        """
+        Returns the x-coordinate of the ship, or None if it is destroyed.
+        """
+        return self._shipX
+
+    def getAlien(self, row, col):
+        """
+        Returns the (x,y) center of the alien at (row, col), or None if destroyed.
+
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the column of the alien (0 is the leftmost column)
+        Precondition: col is an int in 0..cols-1
+        """
+        return self._aliens.getAlien(row, col)
+
+    def getAliens(self):
+        """
+        Returns the block of aliens.
+
+        The formation is shared with this engine, so it should be treated as read-only.
+        """
+        return self._aliens
+
+    def getBolts(self):
+        """
+        Returns the pool of bolts on screen.
+
+        The pool is shared with this engine, so it should be treated as read-only.
+        """
+        return self._bolts
+
+    def setShip(self):
+        """
+        Places a new ship at the center of the screen.
+        """
+        self._shipX = GAME_WIDTH/2
+        self._respawned = True
+
+    def popEvents(self):
+        """
+        Returns the list of events since the last call, and clears it.
+        """
+        events = self._events
+        self._events = []
+        return events
+
+    def getSeed(self):
+        """
+        Returns the seed of the random number generator of this wave.
+        """
+        return self._seed
+
+    def getLog(self):
+        """
+        Returns the input log as bytes (one INPUT bit mask per tick).
+
+        The log is None in variable-step mode, where a tick also depends on dt.
+        """
+        return None if self._log is None else bytes(self._log)
+
+    def getOutcome(self):
+        """
+        Returns OUTCOME_WIN or OUTCOME_LOSE if the wave is over, or None otherwise.
+        """
+        if self._aliens.getAliveCount() == 0:
+            return OUTCOME_WIN
+        if (self._shipX is None and self._lives == 0) or self.aliensPassedDefLine():
+            return OUTCOME_LOSE
+        return None
+
+    def getTicks(self):
+        """
+        Returns the number of simulation ticks run so far.
+        """
+        return self._ticks
+
+    # INITIALIZER
+    def __init__(self, rate=SIM_RATE, seed=None, capacity=BOLT_CAPACITY,
+                 rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, speed=ALIEN_SPEED,
+                 width=ALIEN_WIDTH, height=ALIEN_HEIGHT, hsep=ALIEN_H_SEP, vsep=ALIEN_V_SEP):
+        """
+        Initializes a new wave with a full block of aliens and a new ship.
+
+        The aliens march a quarter of their width per step, and drop half of their
+        height at a wall, like the aliens of the normal game (ALIEN_H_WALK and
+        ALIEN_V_WALK).
+
+        If rate is None, the engine runs in variable-step mode: every update is one
+        tick of length dt, and the ship and bolts move a fixed distance per update
+        (like the original game, whose speed followed the frame rate).
+
+        Parameter rate: the number of fixed simulation ticks per second
+        Precondition: rate is an int > 0, or None
+
+        Parameter seed: the seed for the random number generator (None picks one)
+        Precondition: seed is an int, or None
+
+        Parameter capacity: the most bolts that can be on screen at once
+        Precondition: capacity is an int > 0
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
+
+        Parameter speed: the initial number of seconds between alien steps
+        Precondition: speed is a number > 0
+
+        Parameter width, height: the size of an alien
+        Precondition: width, height are ints > 0
+
+        Parameter hsep, vsep: the horizontal and vertical separation between aliens
+        Precondition: hsep, vsep are ints >= 0
+        """
+        self._seed = random.getrandbits(32) if seed is None else seed
+        self._random = random.Random(self._seed)
+        self._log = None if rate is None else bytearray()
+        self._respawned = False
+        self._rate = rate
+        self._lag = 0
+        self._ticks = 0
+        scale = 1 if rate is None else FRAME_RATE/rate
+        self._shipSpeed = SHIP_MOVEMENT*scale
+        self._boltSpeed = BOLT_SPEED*scale
+        self._hWalk = width // 4
+        self._vWalk = height // 2
+        self._margin = width/2 + hsep
+        self._blockAliens(rows, cols, width, height, hsep, vsep)
+        self._shipX = GAME_WIDTH/2
+        self._bolts = BoltPool(capacity)
+        self._time = 0
+        self._direction = 'right'
+        self._stepsToFire = self._random.randint(1,BOLT_RATE)
+        self._lives = SHIP_LIVES
+        self._score = 0
+        self._waveSpeed = speed
+        self._events = []
+
+    # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
+    def update(self, user_input, dt):
+        """
+        Advances the wave by one frame.
+
+        In fixed-timestep mode this runs every whole tick that fits in the time not
+        yet simulated (possibly none), all with the same user input.  At most
+        SIM_MAX_LAG seconds are caught up on, so a very long frame (like a window drag)
+        cannot stall the game with a burst of ticks.
+
+        Parameter user_input: whether right, left and fire are pressed
+        Precondition: user_input is a list of three bools [right, left, fire]
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        if self._rate is None:
+            self._tick(user_input, dt)
+            return
+
+        step = 1.0/self._rate
+        self._lag = min(self._lag+dt, SIM_MAX_LAG)
+        while self._lag >= step:
+            self._lag -= step
+            self._tick(user_input, step)
+
+    def replay(self, log):
+        """
+        Runs one tick for every entry of an input log.
+
+        Applied to a new engine with the same seed and rate as the engine that
+        recorded the log, this reproduces that game exactly.
+
+        Parameter log: the input log to replay
+        Precondition: log is a bytes-like sequence of INPUT bit masks; this engine
+        is in fixed-timestep mode
+        """
+        step = 1.0/self._rate
+        for code in log:
+            if code & INPUT_RESPAWN:
+                self.setShip()
+            self._tick((bool(code & INPUT_RIGHT), bool(code & INPUT_LEFT),
+            bool(code & INPUT_FIRE)), step)
+
+    def aliensPassedDefLine(self):
+        """
+        Returns True if any alien which is not destroyed has passed
+        the defensive line; Otherwise, returns False.
+        """
+        return (self._aliens.getAliveCount() > 0 and
+        self._aliens.lowestY()-self._aliens.getHeight()/2 <= DEFENSE_LINE)
+
+    # HELPER METHODS FOR INITIALIZER
+    def _blockAliens(self, rows, cols, width, height, hsep, vsep):
+        """
+        Creates the block (a Formation) of aliens.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
+
+        Parameter width, height: the size of an alien
+        Precondition: width, height are numbers > 0
+
+        Parameter hsep, vsep: the horizontal and vertical separation between aliens
+        Precondition: hsep, vsep are numbers >= 0
+        """
+        block_left = hsep + width/2
+        block_height = rows * height + (rows-1)*hsep
+        block_bottom = GAME_HEIGHT - block_height - ALIEN_CEILING
+        self._aliens = Formation(rows, cols, block_left, block_bottom, width, height,
+                                 hsep, vsep)
+
+    # HELPER METHODS FOR UPDATE
+    def _tick(self, user_input, dt):
+        """
+        Advances the wave by one simulation tick.
+
+        Parameter user_input: whether right, left and fire are pressed
+        Precondition: user_input is a list of three bools [right, left, fire]
+
+        Parameter dt: The length of the tick in seconds
+        Precondition: dt is a number (int or float) >= 0
+        """
+        if self._log is not None:
+            code = INPUT_RESPAWN if self._respawned else 0
+            if user_input[0]:
+                code |= INPUT_RIGHT
+            if user_input[1]:
+                code |= INPUT_LEFT
+            if user_input[2]:
+                code |= INPUT_FIRE
+            self._log.append(code)
+        self._respawned = False
+        self._shipController(user_input)
+        self._alienController(dt)
+        self._boltsController()
+        self._ticks += 1
+
+    def _alienController(self, dt):
+        """
+        Moves the block of aliens and generates laser bolts from the aliens.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._time += dt
+        if self._time >= self._waveSpeed and self._aliens.getAliveCount() > 0:
+            if self._direction == 'right':
+                if self._aliens.rightestX() + self._hWalk <= GAME_WIDTH - self._margin:
+                    self._aliens.move(self._hWalk, 0)
+                else:
+                    self._direction = 'left'
+                    self._aliens.move(0, -self._vWalk)
+            elif self._direction == 'left':
+                if self._aliens.leftestX() - self._hWalk >= self._margin:
+                    self._aliens.move(-self._hWalk, 0)
+                else:
+                    self._direction = 'right'
+                    self._aliens.move(0, -self._vWalk)
+            self._stepsToFire -= 1
+            if self._stepsToFire == 0:
+                col = self._random.choice(self._aliens.getLiveColumns())
+                shooter = self._aliens.getData()[self._aliens.bottomAlien(col)]
+                if self._bolts.fire(float(shooter['x']),
+                float(shooter['y'])-self._aliens.getHeight()/2-BOLT_HEIGHT/2,
+                -self._boltSpeed) >= 0:
+                    self._events.append(EVENT_ALIEN_PEW)
+                self._stepsToFire = self._random.randint(1,BOLT_RATE)
+            if self._rate is None:
+                self._time = 0
+            else:
+                self._time -= self._waveSpeed
+
+    def _shipController(self, user_input):
+        """
+        Moves the ship to the left and to the right and generates ship laser
+        bolts, according to the user's input.
+
+        Parameter user_input: whether right, left and fire are pressed
+        Precondition: user_input is a list of three bools [right, left, fire]
+        """
+        if self._shipX is None:
+            return
+        if user_input[0]:
+            self._shipX += min(self._shipSpeed, GAME_WIDTH - SHIP_WIDTH/2 - self._shipX)
+        if user_input[1]:
+            self._shipX -= min(self._shipSpeed, self._shipX - SHIP_WIDTH/2)
+        if user_input[2] and self._bolts.getPlayerCount() == 0:
+            if self._bolts.fire(self._shipX,
+            SHIP_BOTTOM + SHIP_HEIGHT + BOLT_HEIGHT/2, self._boltSpeed) >= 0:
+                self._events.append(EVENT_SHIP_PEW)
+
+    def _boltsController(self):
+        """
+        Moves the bolts and resolves their collisions with the aliens and the ship.
+
+        A player bolt that hits an alien destroys it, adds to the score and speeds up
+        the rest of the aliens.  An alien bolt that hits the ship destroys it and
+        costs a life.  Bolts that leave the screen are removed.
+
+        Moving, the ship test and culling each work on every bolt at once.  Only the
+        player bolts (rarely more than one) are tested against the aliens one by one.
+        """
+        pool = self._bolts
+        pool.advance()
+        for slot in pool.getPlayerSlots():
+            if self._hitAlien(pool.getX(slot), pool.getY(slot)):
+                pool.expire(slot)
+        if self._shipX is not None:
+            slot = pool.findHit(self._shipX, SHIP_BOTTOM + SHIP_HEIGHT/2,
+            SHIP_WIDTH, SHIP_HEIGHT)
+            if slot >= 0:
+                self._events.append(EVENT_BLAST)
+                self._shipX = None
+                self._lives -= 1
+                pool.expire(slot)
+        pool.cull()
+
+    def _hitAlien(self, x, y):
+        """
+        Returns True if a player bolt at (x,y) destroyed an alien; False otherwise.
+
+        Parameter x: the x-coordinate of the center of the bolt
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y-coordinate of the center of the bolt
+        Precondition: y is a number (int or float)
+        """
+        index = self._aliens.findHit(x, y, BOLT_WIDTH, BOLT_HEIGHT)
+        if index < 0:
+            return False
+        self._events.append(EVENT_POP)
+        self._aliens.kill(index)
+        self._score += (index//self._aliens.getCols()+1)*ALIEN_POINTS
+        self._waveSpeed *= ALIEN_ACCELERATION
+        return True
@@ -0,0 +1,245 @@
+"""
+Parallel headless runs of Alien Invaders
+
+This module spreads many headless games (each a WaveEngine) across a pool of worker
+processes, so that nightly balance and performance sweeps can use every core.  Each
+game is described by a Job: its seed, its configuration (the number of rows, the
+aliens per row and the starting speed of the aliens), an input policy and a limit on
+the number of ticks.  Each worker plays its games to the end and reports a Result
+with the score, the game duration and the simulation speed.
+
+A policy is the name of one of the functions in POLICIES.  Each policy is a scripted
+bot that picks the [right, left, fire] input of a tick from the state of the engine.
+Policies are passed by name, so that a job can be pickled and sent to a worker.
+
+The farm can also be run as a script:
+
+    python farm.py --games 200 --config 5x12@1.0 --config 10x15@0.5 --policy track
+
+prints one line per game and a summary of each configuration.
+
+Like engine.py, this module never imports game2d or Kivy.
+"""
+from consts import *
+from engine import WaveEngine, OUTCOME_WIN
+import collections
+import multiprocessing
+import random
+import time
+
+
+#: the description of a single game [seed, rows, cols, speed, policy, max_ticks]
+Job = collections.namedtuple('Job', 'seed rows cols speed policy max_ticks')
+
+#: the report of a single game
+#:     job:      the game that was played [Job]
+#:     score:    the final score [int >= 0]
+#:     lives:    the lives left [int >= 0]
+#:     aliens:   the aliens left [int >= 0]
+#:     outcome:  OUTCOME_WIN, OUTCOME_LOSE or None (if the game hit max_ticks)
+#:     ticks:    the number of simulation ticks played [int >= 0]
+#:     duration: the length of the game in seconds of game time [float >= 0]
+#:     wall:     the time in seconds it took to simulate the game [float >= 0]
+#:     fps:      the simulation ticks per second of wall time [float >= 0]
+Result = collections.namedtuple('Result',
+                                'job score lives aliens outcome ticks duration wall fps')
+
+
+# POLICIES
+def idle(engine, rng):
+    """
+    Returns the input of a bot that never does anything.
+
+    Parameter engine: the game to play
+    Precondition: engine is a WaveEngine
+
+    Parameter rng: the random number generator of the bot
+    Precondition: rng is a random.Random
+    """
+    return (False, False, False)
+
+
+def sweep(engine, rng):
+    """
+    Returns the input of a bot that fires while sweeping from wall to wall.
+
+    Parameter engine: the game to play
+    Precondition: engine is a WaveEngine
+
+    Parameter rng: the random number generator of the bot
+    Precondition: rng is a random.Random
+    """
+    right = (engine.getTicks()//SIM_RATE) % 2 == 0
+    return (right, not right, True)
+
+
+def jitter(engine, rng):
+    """
+    Returns the input of a bot that mashes random keys.
+
+    Parameter engine: the game to play
+    Precondition: engine is a WaveEngine
+
+    Parameter rng: the random number generator of the bot
+    Precondition: rng is a random.Random
+    """
+    return (rng.random() < 0.3, rng.random() < 0.3, rng.random() < 0.5)
+
+
+def track(engine, rng):
+    """
+    Returns the input of a bot that chases the nearest bottom alien and fires under it.
+
+    Parameter engine: the game to play
+    Precondition: engine is a WaveEngine
+
+    Parameter rng: the random number generator of the bot
+    Precondition: rng is a random.Random
+    """
+    x = engine.getShipX()
+    aliens = engine.getAliens()
+    if x is None or aliens.getAliveCount() == 0:
+        return (False, False, False)
+    xs = aliens.getData()['x']
+    target = min((float(xs[index]) for index in aliens.bottomAliens()),
+                 key=lambda ax: abs(ax-x))
+    close = abs(target-x) < ALIEN_WIDTH/2
+    return (target > x and not close, target < x and not close, close)
+
+
+#: the input policies that a Job may name
+POLICIES = {'idle': idle, 'sweep': sweep, 'jitter': jitter, 'track': track}
+
+
+# RUNNER
+def play(job):
+    """
+    Returns the Result of playing a single game to the end.
+
+    The game ends when it is won or lost, or after job.max_ticks ticks.  A destroyed
+    ship is replaced at once, as long as there are lives left.
+
+    Parameter job: the game to play
+    Precondition: job is a Job whose policy is a key of POLICIES
+    """
+    policy = POLICIES[job.policy]
+    rng = random.Random(job.seed)
+    engine = WaveEngine(seed=job.seed, rows=job.rows, cols=job.cols, speed=job.speed)
+    step = 1.0/SIM_RATE
+
+    start = time.perf_counter()
+    outcome = engine.getOutcome()
+    while outcome is None and engine.getTicks() < job.max_ticks:
+        if engine.getShipX() is None:
+            engine.setShip()
+        engine.update(policy(engine, rng), step)
+        outcome = engine.getOutcome()
+    wall = time.perf_counter()-start
+
+    ticks = engine.getTicks()
+    return Result(job, engine.getScore(), engine.getLives(), engine.getAliensLeft(),
+                  outcome, ticks, ticks*step, wall, ticks/wall if wall > 0 else 0.0)
+
+
+def run(jobs, processes=None, chunksize=4):
+    """
+    Returns the list of Results of playing every job, in the order of the jobs.
+
+    The jobs are spread over a pool of worker processes.  Each worker plays whole
+    games, so no state is shared between processes while the games run.
+
+    Parameter jobs: the games to play
+    Precondition: jobs is a sequence of Job
+
+    Parameter processes: the number of worker processes (None for one per core)
+    Precondition: processes is an int > 0, or None
+
+    Parameter chunksize: the number of jobs sent to a worker at a time
+    Precondition: chunksize is an int > 0
+    """
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(play, jobs, chunksize)
+
+
+def makeJobs(count, configs, policy='track', seed=0, max_ticks=SIM_RATE*600):
+    """
+    Returns a list of count jobs for each configuration, with consecutive seeds.
+
+    Parameter count: the number of games per configuration
+    Precondition: count is an int > 0
+
+    Parameter configs: the configurations to play
+    Precondition: configs is a sequence of (rows, cols, speed) tuples
+
+    Parameter policy: the input policy of every game
+    Precondition: policy is a key of POLICIES
+
+    Parameter seed: the seed of the first game
+    Precondition: seed is an int
+
+    Parameter max_ticks: the most ticks each game may last
+    Precondition: max_ticks is an int > 0
+    """
+    assert policy in POLICIES, 'unknown policy %s' % repr(policy)
+    jobs = []
+    for rows, cols, speed in configs:
+        for k in range(count):
+            jobs.append(Job(seed+len(jobs), rows, cols, speed, policy, max_ticks))
+    return jobs
+
+
+def parseConfig(text):
+    """
+    Returns the configuration (rows, cols, speed) written as ROWSxCOLS@SPEED.
+
+    Parameter text: the configuration to parse, like '5x12@1.0'
+    Precondition: text is a str
+    """
+    size, _, speed = text.partition('@')
+    rows, _, cols = size.partition('x')
+    return (int(rows), int(cols), float(speed) if speed else ALIEN_SPEED)
+
+
+def main():
+    """
+    Runs the farm from the command line, and prints the results.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='Play headless Alien Invaders games '+
+                                     'on every core.')
+    parser.add_argument('--games', type=int, default=multiprocessing.cpu_count()*4,
+                        help='games per configuration')
+    parser.add_argument('--config', action='append', type=parseConfig,
+                        help='a configuration ROWSxCOLS@SPEED (may be repeated)')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='track',
+                        help='the input policy of every game')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the first game')
+    parser.add_argument('--max-ticks', type=int, default=SIM_RATE*600,
+                        help='the most ticks a game may last')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    args = parser.parse_args()
+    configs = args.config or [(ALIEN_ROWS, ALIENS_IN_ROW, ALIEN_SPEED)]
+
+    jobs = makeJobs(args.games, configs, args.policy, args.seed, args.max_ticks)
+    start = time.perf_counter()
+    results = run(jobs, args.processes)
+    wall = time.perf_counter()-start
+
+    for r in results:
+        print('seed %-6d %2dx%-2d @%.2f  score %5d  %-4s  %7.1fs  %9.0f fps' %
+              (r.job.seed, r.job.rows, r.job.cols, r.job.speed, r.score,
+               r.outcome or '-', r.duration, r.fps))
+    print()
+    for config in configs:
+        games = [r for r in results if (r.job.rows, r.job.cols, r.job.speed) == config]
+        wins = sum(1 for r in games if r.outcome == OUTCOME_WIN)
+        print('%2dx%-2d @%.2f  games %d  wins %d  mean score %.1f  mean fps %.0f' %
+              (config[0], config[1], config[2], len(games), wins,
+               sum(r.score for r in games)/len(games), sum(r.fps for r in games)/len(games)))
+    ticks = sum(r.ticks for r in results)
+    print('%d games, %d ticks in %.2fs (%.0f ticks/s)' % (len(results), ticks, wall, ticks/wall))
+
+
+if __name__ == '__main__':
+    main()
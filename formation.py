@@ -0,0 +1,343 @@
+"""
+Alien formation for Alien Invaders
+
+This module contains the block of aliens used by the headless engine.  The block is
+stored as a single NumPy structured array rather than a 2d list of objects, so that
+a march step, a drop step or an alive count is one vectorized operation.  The cost of
+these operations is then flat in the number of aliens, instead of paying a Python
+method call (and a type check) per alien.
+
+The formation also keeps an index of its own extents (the live columns, the bottom
+live alien of each column and the lowest live row).  The index is updated when an
+alien dies, so the queries the engine makes on every step or every frame are O(1)
+instead of a scan over the whole grid.  It also logs the aliens killed since the last
+call to popKilled, so that a renderer only has to visit the aliens that changed.
+
+The size and spacing of the aliens default to those of the game, but any formation
+may use its own.  The swarm mode uses tiny aliens to fit tens of thousands of them on
+the screen; nothing in this module costs more than O(1) per alien killed or per
+bolt tested, so it runs at the same speed.
+
+Like engine.py, this module never imports game2d or Kivy.
+"""
+from consts import *
+import numpy as np
+import math
+
+
+#: the record type of a single alien in a Formation
+ALIEN_DTYPE = np.dtype([('x', np.float64), ('y', np.float64),
+                        ('row', np.int32), ('col', np.int32), ('alive', np.bool_)])
+
+#: the horizontal distance between the centers of neighbouring aliens (of the game)
+H_PITCH = ALIEN_WIDTH+ALIEN_H_SEP
+#: the vertical distance between the centers of neighbouring aliens (of the game)
+V_PITCH = ALIEN_HEIGHT+ALIEN_V_SEP
+
+
+class Formation(object):
+    """
+    A class representing a rectangular block of aliens.
+
+    The aliens are stored row-major in a flat structured array with the fields x, y
+    (the alien center), row, col and alive.  Row 0 is the bottom row and column 0 is
+    the leftmost column, so the alien at (row, col) is the record row*cols+col.
+
+    Destroyed aliens keep their record (with alive False) and keep moving with the
+    block.  That way every record always sits on a regular grid, and the position of
+    any row or column can be read from any record in it.
+
+    INSTANCE ATTRIBUTES:
+        _rows:   the number of rows in the block [int > 0]
+        _cols:   the number of aliens in a row [int > 0]
+        _data:   the alien records [1d array of ALIEN_DTYPE, length rows*cols]
+        _count:  the number of aliens still alive [int >= 0]
+        _colCount: the number of live aliens in each column [list of int >= 0]
+        _rowCount: the number of live aliens in each row [list of int >= 0]
+        _colBottom: the lowest live row in each column [list of int, -1 if empty]
+        _liveCols: the columns with a live alien, left to right [list of int]
+        _lowestRow: the lowest row with a live alien [int, rows if none]
+        _killed: the record indices killed since the last popKilled [list of int]
+        _width:  the width of an alien [number > 0]
+        _height: the height of an alien [number > 0]
+        _hsep:   the horizontal separation between aliens [number >= 0]
+        _vsep:   the vertical separation between aliens [number >= 0]
+        _hpitch: the horizontal distance between alien centers [number > 0]
+        _vpitch: the vertical distance between alien centers [number > 0]
+    """
+
+    # GETTERS AND SETTERS
+    def getRows(self):
+        """
+        Returns the number of rows in the block.
+        """
+        return self._rows
+
+    def getCols(self):
+        """
+        Returns the number of aliens in a row.
+        """
+        return self._cols
+
+    def getWidth(self):
+        """
+        Returns the width of an alien.
+        """
+        return self._width
+
+    def getHeight(self):
+        """
+        Returns the height of an alien.
+        """
+        return self._height
+
+    def getHSep(self):
+        """
+        Returns the horizontal separation between aliens.
+        """
+        return self._hsep
+
+    def getVSep(self):
+        """
+        Returns the vertical separation between aliens.
+        """
+        return self._vsep
+
+    def getData(self):
+        """
+        Returns the structured array of alien records.
+
+        The array is shared with this formation, so it should be treated as read-only.
+        """
+        return self._data
+
+    def getAliveCount(self):
+        """
+        Returns the number of aliens still alive.
+        """
+        return self._count
+
+    def getAlien(self, row, col):
+        """
+        Returns the (x,y) center of the alien at (row, col), or None if destroyed.
+
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the column of the alien (0 is the leftmost column)
+        Precondition: col is an int in 0..cols-1
+        """
+        alien = self._data[row*self._cols+col]
+        if not alien['alive']:
+            return None
+        return (float(alien['x']), float(alien['y']))
+
+    def isAlive(self, row, col):
+        """
+        Returns True if the alien at (row, col) is alive; False otherwise.
+
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the column of the alien (0 is the leftmost column)
+        Precondition: col is an int in 0..cols-1
+        """
+        return bool(self._data['alive'][row*self._cols+col])
+
+    # INITIALIZER
+    def __init__(self, rows, cols, left, bottom, width=ALIEN_WIDTH, height=ALIEN_HEIGHT,
+                 hsep=ALIEN_H_SEP, vsep=ALIEN_V_SEP):
+        """
+        Initializes a full block of aliens.
+
+        Parameter rows: the number of rows in the block
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
+
+        Parameter left: the x-coordinate of the center of the bottom left alien
+        Precondition: left is a number (int or float)
+
+        Parameter bottom: the y-coordinate of the center of the bottom left alien
+        Precondition: bottom is a number (int or float)
+
+        Parameter width, height: the size of an alien
+        Precondition: width, height are numbers > 0
+
+        Parameter hsep, vsep: the horizontal and vertical separation between aliens
+        Precondition: hsep, vsep are numbers >= 0
+        """
+        self._rows = rows
+        self._cols = cols
+        self._width = width
+        self._height = height
+        self._hsep = hsep
+        self._vsep = vsep
+        self._hpitch = width+hsep
+        self._vpitch = height+vsep
+        self._data = np.zeros(rows*cols, dtype=ALIEN_DTYPE)
+        self._data['row'] = np.repeat(np.arange(rows, dtype=np.int32), cols)
+        self._data['col'] = np.tile(np.arange(cols, dtype=np.int32), rows)
+        self._data['x'] = left + self._hpitch*self._data['col']
+        self._data['y'] = bottom + self._vpitch*self._data['row']
+        self._data['alive'] = True
+        self._count = rows*cols
+        self._colCount = [rows]*cols
+        self._rowCount = [cols]*rows
+        self._colBottom = [0]*cols
+        self._liveCols = list(range(cols))
+        self._lowestRow = 0
+        self._killed = []
+
+    # PUBLIC METHODS
+    def move(self, dx, dy):
+        """
+        Moves the whole block by (dx, dy).
+
+        Parameter dx: the horizontal distance to move
+        Precondition: dx is a number (int or float)
+
+        Parameter dy: the vertical distance to move
+        Precondition: dy is a number (int or float)
+        """
+        if dx:
+            self._data['x'] += dx
+        if dy:
+            self._data['y'] += dy
+
+    def kill(self, index):
+        """
+        Marks the alien record at index as destroyed, and updates the extents.
+
+        Each extent only ever moves inward, so the scans below cost O(rows+cols) over
+        the whole life of the formation, not per kill.
+
+        Parameter index: the position of the record in the array
+        Precondition: index is an int in 0..rows*cols-1 for a live alien
+        """
+        alive = self._data['alive']
+        alive[index] = False
+        self._count -= 1
+        self._killed.append(index)
+        row, col = divmod(index, self._cols)
+
+        self._colCount[col] -= 1
+        if self._colCount[col] == 0:
+            self._colBottom[col] = -1
+            self._liveCols.remove(col)
+        elif self._colBottom[col] == row:
+            bottom = row+1
+            while not alive[bottom*self._cols+col]:
+                bottom += 1
+            self._colBottom[col] = bottom
+
+        self._rowCount[row] -= 1
+        while self._lowestRow < self._rows and self._rowCount[self._lowestRow] == 0:
+            self._lowestRow += 1
+
+    def popKilled(self):
+        """
+        Returns the record indices of the aliens killed since the last call, and clears them.
+
+        The indices are in the order of the kills.  Each alien can only be killed once,
+        so the log never holds more than rows*cols indices, even if nobody pops it.
+        """
+        killed = self._killed
+        self._killed = []
+        return killed
+
+    def countAlive(self):
+        """
+        Returns the number of live aliens, counted from the alive mask.
+
+        This should always agree with getAliveCount(), which is maintained on kill.
+        """
+        return int(np.count_nonzero(self._data['alive']))
+
+    def rightestX(self):
+        """
+        Returns the x-coordinate of the rightmost live alien.
+
+        Precondition: at least one alien is alive
+        """
+        return float(self._data['x'][self._liveCols[-1]])
+
+    def leftestX(self):
+        """
+        Returns the x-coordinate of the leftmost live alien.
+
+        Precondition: at least one alien is alive
+        """
+        return float(self._data['x'][self._liveCols[0]])
+
+    def lowestY(self):
+        """
+        Returns the y-coordinate of the lowest live alien.
+
+        Precondition: at least one alien is alive
+        """
+        return float(self._data['y'][self._lowestRow*self._cols])
+
+    def getLiveColumns(self):
+        """
+        Returns the columns that still have a live alien, from left to right.
+
+        The list is shared with this formation, so it should be treated as read-only.
+        """
+        return self._liveCols
+
+    def bottomAlien(self, col):
+        """
+        Returns the record index of the bottom live alien in a column.
+
+        Parameter col: the column to search
+        Precondition: col is an int in 0..cols-1 with at least one live alien
+        """
+        return self._colBottom[col]*self._cols+col
+
+    def bottomAliens(self):
+        """
+        Returns the record indices of the bottom live alien in each column.
+
+        The indices are ordered from the leftmost column to the rightmost one.
+        Columns with no live aliens are skipped.
+        """
+        return [self._colBottom[col]*self._cols+col for col in self._liveCols]
+
+    def findHit(self, x, y, width, height):
+        """
+        Returns the index of the first live alien overlapping a rectangle, or -1.
+
+        Aliens are searched row-major, from the bottom row up.  Because the records sit
+        on a regular grid, the rectangle is first mapped straight to the few rows and
+        columns it can reach (one or two of each for a bolt).  The exact overlap test
+        then only runs on those cells, so the cost does not depend on the grid size.
+
+        Parameter x, y: the center of the rectangle
+        Precondition: x, y are numbers (int or float)
+
+        Parameter width, height: the size of the rectangle
+        Precondition: width, height are numbers (int or float) >= 0
+        """
+        data = self._data
+        reachx = (self._width+width)/2
+        reachy = (self._height+height)/2
+
+        # Broad phase: the grid cells whose alien could overlap the rectangle
+        left = data['x'][0]
+        bottom = data['y'][0]
+        col0 = max(0, math.floor((x-reachx-left)/self._hpitch))
+        col1 = min(self._cols-1, math.ceil((x+reachx-left)/self._hpitch))
+        row0 = max(self._lowestRow, math.floor((y-reachy-bottom)/self._vpitch))
+        row1 = min(self._rows-1, math.ceil((y+reachy-bottom)/self._vpitch))
+
+        # Narrow phase: the exact overlap test on those cells only
+        alive = data['alive']
+        xs = data['x']
+        ys = data['y']
+        for row in range(row0, row1+1):
+            for index in range(row*self._cols+col0, row*self._cols+col1+1):
+                if alive[index] and abs(xs[index]-x) < reachx and abs(ys[index]-y) < reachy:
+                    return index
+        return -1
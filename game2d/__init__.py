@@ -8,9 +8,14 @@ Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
+from .grectangle import GRectangle, GEllipse, GImage, GBitmap, GLabel
 from .gsprite import GSprite
+from .gbatch import GBatch
+from .gclock import GClock
+from .gcache import GLabelCache
+from .gtext import GFont, GText
 from .gpath import GPath, GTriangle, GPolygon
 from .gview import GInput, GView
+from .gstats import FrameStats
 from .sound import Sound, SoundLibrary
 from .app import GameApp
\ No newline at end of file
@@ -15,7 +15,18 @@ import kivy.app
 from kivy.config import Config
 from kivy.clock  import Clock
 
+import os
 import os.path
+import time
+
+
+#: The profiling modes of GameApp, by their (lower case) name in GAME2D_PROFILE
+PROFILE_MODES = {'': False, '0': False, 'false': False, 'no': False, 'off': False,
+                 '1': True, 'true': True, 'yes': True, 'on': True, 'overlay': 'overlay'}
+
+#: The values of GAME2D_RELEASE (in lower case) that turn on release mode
+RELEASE_ON = ('1', 'true', 'yes')
+
 
 class GameApp(kivy.app.App):
     """
@@ -35,6 +46,14 @@ class GameApp(kivy.app.App):
     
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to ``self.view.draw()``.
+    
+    To find out where the time of a frame goes, turn on profiling with the keyword
+    ``profile`` (or the environment variable ``GAME2D_PROFILE``).  The times of every
+    frame are then recorded in the attribute ``stats``.  With profiling off (the
+    default), frames are not timed at all.
+
+    Once the game works, the keyword ``release`` (or the environment variable
+    ``GAME2D_RELEASE``) skips the argument checks of the hottest game object methods.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
@@ -94,6 +113,18 @@ class GameApp(kivy.app.App):
         """
         return self._view
     
+    @property
+    def stats(self):
+        """
+        The frame-time statistics of this game.
+        
+        This is None unless profiling is on.  See the class :class:`FrameStats` for 
+        more information.
+        
+        **Invariant**: Must be instance of :class:`FrameStats` or None.
+        """
+        return self._stats
+    
     @property
     def input(self):
         """
@@ -170,6 +201,9 @@ class GameApp(kivy.app.App):
         has already been loaded, it will return the cached texture.  Otherwise, it will
         load the texture and cache it before returning it.
         
+        If the image was packed into the texture atlas at startup (see the keyword 
+        ``atlas`` of the constructor), the texture is a region of the atlas.
+        
         This method will crash if name is not a valid file.
         
         :param name: The file name
@@ -223,6 +257,26 @@ class GameApp(kivy.app.App):
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
+        The small images of the **Images** folder are packed into a texture atlas at
+        startup, so that they share a texture (see the module :mod:`gatlas`).  The atlas
+        is cached in the user data folder of the game (see ``user_data_dir`` in Kivy),
+        or in the folder given by the keyword ``atlas``, if that is a string.  Use the
+        keyword ``atlas=False`` to load every image as a separate texture instead.
+        
+        The keyword ``profile`` turns on frame profiling (see the attribute ``stats``).
+        It is True to record frame times, or ``'overlay'`` to also show the statistics
+        in the corner of the window.  If the keyword is missing, the environment
+        variable ``GAME2D_PROFILE`` is used instead.  As a string, the value may be
+        empty, ``0``, ``false``, ``no`` or ``off`` (profiling is off), ``1``, ``true``,
+        ``yes`` or ``on`` (frame times only) or ``overlay``, in any case.  Any other
+        value is an error.
+        
+        The keyword ``release`` turns on release mode, in which the hot methods of
+        the game objects skip their argument checks (see the module :mod:`grelease`).
+        Only use it once your game works.  If the keyword is missing, the environment
+        variable ``GAME2D_RELEASE`` is used instead.  As a string, only ``1``, ``true``
+        or ``yes`` (in any case) turn it on; any other value leaves the checks on.
+        
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
@@ -232,15 +286,36 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        p = keywords.pop('profile', os.environ.get('GAME2D_PROFILE', ''))
+        a = keywords.pop('atlas', True)
+        r = keywords.pop('release', os.environ.get('GAME2D_RELEASE', ''))
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert type(a) in [bool,str], 'atlas %s is not a bool or a folder' % repr(a)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._atlas = a
+        self._stats = None
+        self._overlay = False
+        self._overlabel = None
+        self._drawn = None
+        if type(p) == str:
+            p = p.strip().lower()
+            assert p in PROFILE_MODES, 'profile %s is not a profiling mode' % repr(p)
+            p = PROFILE_MODES.get(p, False)
+        if p:
+            from .gstats import FrameStats
+            self._stats = FrameStats(f)
+            self._overlay = p == 'overlay'
+        from .grelease import set_release
+        if type(r) == str:
+            r = r.strip().lower() in RELEASE_ON
+        set_release(r)
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -263,6 +338,8 @@ class GameApp(kivy.app.App):
         self._view.size_hint = (1,1)
         self._input = GInput()
         self._input._register(self._view)
+        if self._atlas:
+            self._load_atlas()
         return self.view
     
     def run(self):
@@ -337,6 +414,9 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        if self._stats is not None:
+            from kivy.core.window import Window
+            Window.bind(on_flip=self._flipped)
         self.start()
     
     def _refresh(self,dt):
@@ -349,9 +429,89 @@ class GameApp(kivy.app.App):
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
+        if self._stats is not None:
+            self._profile(dt)
+            return
         self.view.clear()
         self.update(dt)
         self.draw()
+        self.view._commit()
+    
+    def _profile(self,dt):
+        """
+        Processes a single animation frame, recording the time of every phase.
+        
+        This does the same as `_refresh`, but reads the clock between the phases.  If
+        the overlay is on, it is drawn last, on top of the game.  Drawing the overlay
+        is not timed, but it is committed with the game, so the draw phase includes
+        its share of the commit.  As the overlay is one label that stays on the
+        canvas, that share is very small.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        t0 = time.perf_counter()
+        self.view.clear()
+        t1 = time.perf_counter()
+        self.update(dt)
+        t2 = time.perf_counter()
+        self.draw()
+        t3 = time.perf_counter()
+        if self._overlay:
+            self._draw_overlay()
+        t4 = time.perf_counter()
+        self.view._commit()
+        t5 = time.perf_counter()
+        self._stats.record(dt,t1-t0,t2-t1,(t3-t2)+(t5-t4))
+        self._drawn = t5
+    
+    def _flipped(self,*args):
+        """
+        Records the submit time of the last frame, once Kivy has rendered it.
+        
+        This is a callback for the ``on_flip`` event of the window, which Kivy sends
+        after it has drawn the canvas and before it shows the new frame.
+        """
+        if self._drawn is not None:
+            self._stats.submit(time.perf_counter()-self._drawn)
+            self._drawn = None
+    
+    def _draw_overlay(self):
+        """
+        Draws the frame statistics in the top left corner of the window.
+        
+        The label is made once and reused.  Its text is only set twice a second, as
+        laying out the text is slow.
+        """
+        if self._overlabel is None:
+            from .grectangle import GLabel
+            self._overlabel = GLabel(text=str(self._stats),font_size=12,
+                                     font_name='Arial.ttf',linecolor=(1,1,0,1),
+                                     halign='left',valign='top',left=4,top=self.height-4)
+        elif self._stats.count % int(max(1,self._fps/2)) == 0:
+            self._overlabel.text = str(self._stats)
+        self._overlabel.draw(self.view)
+    
+    def _load_atlas(self):
+        """
+        Packs the images into a texture atlas (unless it is up to date) and loads it.
+        
+        The atlas is written to the folder given by the keyword ``atlas``, or else to a
+        folder in the user data folder of the game.  Every packed image is put in the
+        texture cache as a region of the atlas.  If the atlas cannot be packed, the
+        images are loaded separately, as usual.
+        """
+        from .gatlas import pack_atlas, load_atlas
+        if type(self._atlas) == str:
+            output = self._atlas
+        else:
+            try:
+                output = os.path.join(self.user_data_dir,'atlas')
+            except Exception:
+                return
+        manifest = pack_atlas(GameApp.images,output)
+        if manifest:
+            GameApp.TEXTURE_CACHE.update(load_atlas(manifest,GameApp.images))
     
     def _setpaths(self):
         """
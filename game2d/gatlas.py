@@ -0,0 +1,191 @@
+"""
+Texture atlases for 2D game support.
+
+This module packs the small images of the **Images** folder into one or a few large
+textures, called an atlas.  Every image then becomes a region of a shared texture, so
+drawing different images no longer switches textures, and images can be batched (see
+:class:`GBatch`).
+
+The atlas is written to a cache folder outside of the game, as a Kivy ``.atlas``
+manifest plus its pages, so the folder of images is never touched.  It is only packed
+again when an image is added, removed or changed, so after the first run a game just
+loads the cached atlas.  :class:`GameApp` does all of this at startup, with a folder in
+the user data folder of the game, and :meth:`GameApp.load_texture` then returns atlas
+regions instead of separate textures.  Nothing else has to change.
+
+To pack the atlas ahead of time, run this module on the folder of images and the
+folder to write the atlas to (and give that folder to the game as ``atlas``)::
+
+    python -m game2d.gatlas Images cache
+"""
+import os
+import json
+
+#: The image files that may be packed
+EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+#: The base name of the atlas manifest and its pages
+NAME = 'images'
+
+
+def pack_atlas(folder, output, size=1024, limit=256):
+    """
+    Returns the path of the atlas manifest for the images in ``folder``.
+
+    The atlas holds every image whose width and height are at most ``limit``; larger
+    images (such as backgrounds) gain nothing from sharing a texture.  If the atlas on
+    disk is still up to date, it is not packed again.  This returns None if there is
+    nothing to pack, or if the atlas cannot be written (for example, if the image
+    library PIL is missing or the output folder is read-only).
+
+    The output folder is made if it does not exist, and it must not be the folder of
+    images.  Packing the atlas again only replaces the files of the atlas (the manifest
+    and its pages); any other files in the output folder are left alone.
+
+    :param folder: the folder of images
+    :type folder:  ``str``
+
+    :param output: the folder to write the atlas to
+    :type output:  ``str``
+
+    :param size: the width and height of each atlas page
+    :type size:  ``int`` > 0
+
+    :param limit: the largest width or height of a packed image
+    :type limit:  ``int`` > 0
+    """
+    manifest = os.path.join(output,NAME+'.atlas')
+    files = _find_images(folder)
+    if not files or os.path.realpath(output) == os.path.realpath(folder):
+        return None
+
+    if os.path.exists(manifest) and _is_current(manifest,folder,files):
+        return manifest
+
+    try:
+        from PIL import Image
+        from kivy.atlas import Atlas
+        packed = []
+        for name, path in sorted(files.items()):
+            with Image.open(path) as image:
+                if image.size[0] <= limit and image.size[1] <= limit:
+                    packed.append(path)
+        if not packed:
+            return None
+        if not os.path.isdir(output):
+            os.makedirs(output)
+        for old in _find_atlas(output):
+            os.remove(old)
+        if not Atlas.create(os.path.join(output,NAME),packed,size,padding=2):
+            return None
+    except Exception:
+        return None
+    return manifest
+
+
+def load_atlas(manifest, folder):
+    """
+    Returns a dictionary mapping image file names to their atlas regions.
+
+    The keys are the file names in ``folder`` (such as ``'ship.png'``), so they can be
+    used wherever a ``source`` is expected.  This needs a graphics window, as it loads
+    the atlas pages as textures.
+
+    :param manifest: the path of the atlas manifest
+    :type manifest:  ``str``
+
+    :param folder: the folder of images that was packed
+    :type folder:  ``str``
+    """
+    from kivy.atlas import Atlas
+    atlas = Atlas(manifest)
+    regions = {}
+    for name in _find_images(folder):
+        key = os.path.splitext(name)[0]
+        if key in atlas.textures:
+            regions[name] = atlas.textures[key]
+    return regions
+
+
+# HIDDEN FUNCTIONS
+def _find_images(folder):
+    """
+    Returns a dictionary mapping the image file names in ``folder`` to their paths.
+
+    Kivy names atlas regions by the file name without its extension, so if two images
+    differ only by their extension, only the first (in sorted order) is kept.
+
+    :param folder: the folder of images
+    :type folder:  ``str``
+    """
+    files = {}
+    stems = set()
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        path = os.path.join(folder,name)
+        if ext.lower() in EXTENSIONS and os.path.isfile(path) and not stem in stems:
+            files[name] = path
+            stems.add(stem)
+    return files
+
+
+def _find_atlas(output):
+    """
+    Returns the paths of the files of the atlas in ``output``.
+
+    These are the manifest and the pages that Kivy writes for it (``images-0.png``,
+    ``images-1.png`` and so on).  No other file in ``output`` belongs to the atlas.
+
+    :param output: the folder of the atlas
+    :type output:  ``str``
+    """
+    paths = []
+    for name in os.listdir(output):
+        stem, ext = os.path.splitext(name)
+        page = stem[len(NAME)+1:]
+        if name == NAME+'.atlas' or (ext == '.png' and stem.startswith(NAME+'-') and
+                                     page.isdigit()):
+            paths.append(os.path.join(output,name))
+    return paths
+
+
+def _is_current(manifest, folder, files):
+    """
+    Returns True if the atlas in ``manifest`` is newer than ``folder`` and ``files``.
+
+    Adding, removing or renaming an image changes the time stamp of the folder, and
+    editing an image changes its own, so either makes the atlas out of date.
+
+    :param manifest: the path of the atlas manifest
+    :type manifest:  ``str``
+
+    :param folder: the folder of images
+    :type folder:  ``str``
+
+    :param files: the images that should be packed, by file name
+    :type files:  ``dict`` of ``str`` to ``str``
+    """
+    try:
+        with open(manifest) as file:
+            pages = json.load(file)
+        stamp = os.path.getmtime(manifest)
+    except (IOError, ValueError):
+        return False
+
+    stems = set(os.path.splitext(name)[0] for name in files)
+    for page, regions in pages.items():
+        if not os.path.exists(os.path.join(os.path.dirname(manifest),page)):
+            return False
+        if not set(regions) <= stems:
+            return False
+    if os.path.getmtime(folder) > stamp:
+        return False
+    return all(os.path.getmtime(path) <= stamp for path in files.values())
+
+
+if __name__ == '__main__':
+    import sys
+    folder = sys.argv[1] if len(sys.argv) > 1 else 'Images'
+    output = sys.argv[2] if len(sys.argv) > 2 else 'cache'
+    result = pack_atlas(folder,output)
+    print(result if result else 'No atlas was packed for %s' % repr(folder))
@@ -0,0 +1,243 @@
+"""
+Batched image drawing for 2D game support.
+
+This module provides the class :class:`GBatch`, which draws many copies of the same
+image as one Kivy ``Mesh``.  A :class:`GImage` needs half a dozen canvas instructions
+(a matrix, its transforms, a color and a rectangle), so a hundred images are several
+hundred instructions and a hundred draw calls.  A batch is two instructions and a
+single draw call, however many copies it draws.
+
+The copies are placed with NumPy arrays of their centers.  The vertex data lives in a
+NumPy array that is shared with the mesh, so moving every copy only rewrites that array
+in place; nothing is allocated and no instruction is rebuilt.
+
+The image may also be a filmstrip, like that of a :class:`GSprite`.  Every copy then
+shows the same frame, so changing the frame animates the whole batch at once.
+"""
+# Basic Kivy Modules
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+import numpy as np
+
+from .app import GameApp
+from .gsprite import GSprite
+
+
+class GBatch(object):
+    """
+    A class representing a batch of identical images, drawn in one draw call.
+
+    Every copy is an axis-aligned rectangle of size ``width`` x ``height`` showing the
+    image in ``source``.  The copies are not objects of their own: they are placed all at
+    once with the method :meth:`place`, which takes the centers of every copy.  The
+    number of copies is limited by ``capacity``, which is fixed when the batch is made.
+
+    If the image is a filmstrip, its grid of frames is given by ``format`` (rows and
+    columns, as in :class:`GSprite`), and every copy shows the frame ``frame``.
+
+    Unlike :class:`GObject`, a batch cannot be rotated, scaled or tinted, and it has no
+    method ``contains``.  It is only a fast way to draw.
+    """
+    #: The most copies in one batch; Kivy indexes mesh vertices with 16-bit integers
+    MAX_CAPACITY = 16383
+    #: The order of the two triangles of a copy, as offsets of its four corners
+    QUAD = (0, 1, 2, 2, 3, 0)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file of the image.
+
+        **Invariant**: Must be a string refering to a valid file.
+        """
+        return self._source
+
+    @property
+    def width(self):
+        """
+        The width of every copy.
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        The height of every copy.
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._height
+
+    @property
+    def capacity(self):
+        """
+        The most copies that this batch can draw.
+
+        **Invariant**: Must be an int in 1..MAX_CAPACITY.
+        """
+        return self._capacity
+
+    @property
+    def format(self):
+        """
+        The grid size of the filmstrip, as (rows, columns).
+
+        **Invariant**: Must be a tuple of two ints > 0.
+        """
+        return self._format
+
+    @property
+    def count(self):
+        """
+        The number of copies drawn, as set by the last call to :meth:`place`.
+
+        **Invariant**: Must be an int in 0..capacity.
+        """
+        return self._count
+
+
+    # MUTABLE PROPERTIES
+    @property
+    def frame(self):
+        """
+        The animation frame shown by every copy.
+
+        Changing the frame rewrites the texture coordinates of all of the copies at
+        once.
+
+        **Invariant**: Must be an int in 0..rows*columns-1.
+        """
+        return self._frame
+
+    @frame.setter
+    def frame(self,value):
+        assert type(value) == int, '%s is not an int' % repr(value)
+        assert 0 <= value < self._format[0]*self._format[1], '%s is out of range' % repr(value)
+        if value == self._frame:
+            return
+        self._frame = value
+        if self._frames:
+            self._setCoords()
+            if self._count:
+                self._mesh.vertices = self._vertices[:self._count].reshape(-1)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty batch.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to draw up to
+        150 aliens of size 33x33, use the constructor::
+
+            GBatch(source='alien1.png',width=33,height=33,capacity=150)
+
+        The keywords ``source``, ``width`` and ``height`` are required.  The keyword
+        ``capacity`` defaults to 256.  For a filmstrip, the keyword ``format`` gives its
+        rows and columns; it defaults to (1,1), a single frame.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        source = keywords['source']
+        width  = keywords['width']
+        height = keywords['height']
+        capacity = keywords.get('capacity',256)
+        format = keywords.get('format',(1,1))
+        assert GameApp.is_image(source), '%s is not an image file' % repr(source)
+        assert type(width) in [int,float] and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) in [int,float] and height > 0, '%s is not a valid height' % repr(height)
+        assert type(capacity) == int and 0 < capacity <= self.MAX_CAPACITY, \
+            '%s is not a valid capacity' % repr(capacity)
+        assert type(format) == tuple and len(format) == 2 and \
+            type(format[0]) == int and type(format[1]) == int and \
+            format[0] > 0 and format[1] > 0, '%s is not a valid format' % repr(format)
+        self._source = source
+        self._format = format
+        self._frame  = 0
+        self._width  = width
+        self._height = height
+        self._capacity = capacity
+        self._count = 0
+
+        # The corners of a copy, counter-clockwise from the bottom left, about its center
+        self._dx = np.array((-width, width, width, -width),dtype=np.float32)/2
+        self._dy = np.array((-height,-height,height,height),dtype=np.float32)/2
+
+        # Every vertex is (x, y, u, v); the texture coordinates never change
+        self._vertices = np.zeros((capacity,4,4),dtype=np.float32)
+        self._indices = (np.arange(capacity,dtype=np.uint16)[:,None]*4+
+                         np.array(self.QUAD,dtype=np.uint16)).ravel()
+        self._reset()
+
+
+    # PUBLIC METHODS
+    def place(self,xs,ys):
+        """
+        Draws one copy of the image centered at each point (xs[i], ys[i]).
+
+        This replaces all of the copies drawn before.  It only rewrites the vertex data
+        of the batch, so it is cheap even when every copy moves.
+
+        :param xs: the x-coordinates of the centers
+        :type xs:  NumPy array or sequence of numbers, of length <= capacity
+
+        :param ys: the y-coordinates of the centers
+        :type ys:  NumPy array or sequence of numbers, the same length as xs
+        """
+        count = len(xs)
+        assert count <= self._capacity, 'batch of %d cannot draw %d copies' % (self._capacity,count)
+        assert len(ys) == count, 'xs and ys have different lengths'
+        if count:
+            vertices = self._vertices
+            vertices[:count,:,0] = np.asarray(xs,dtype=np.float32)[:,None]+self._dx
+            vertices[:count,:,1] = np.asarray(ys,dtype=np.float32)[:,None]+self._dy
+            # Assigning the buffer again tells Kivy to upload it; nothing is copied here
+            self._mesh.vertices = vertices[:count].reshape(-1)
+            if count != self._count:
+                self._mesh.indices = self._indices[:6*count]
+        elif self._count:
+            self._mesh.indices = []
+            self._mesh.vertices = []
+        self._count = count
+
+    def draw(self, view):
+        """
+        Draws this batch in the provide view.
+
+        Ideally, the view should be the one provided by :class:`GameApp`.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._cache)
+
+
+    # HIDDEN METHODS
+    def _setCoords(self):
+        """
+        Writes the texture coordinates of the current frame into every copy.
+        """
+        u0, v0, u1, v1, u2, v2, u3, v3 = self._frames[self._frame].tex_coords
+        self._vertices[:,:,2] = (u0, u1, u2, u3)
+        self._vertices[:,:,3] = (v0, v1, v2, v3)
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        self._texture = GameApp.load_texture(self._source)
+        # The frames are shared with every sprite of the same filmstrip
+        self._frames = GSprite.load_frames(self._source,self._format)
+        if self._frames:
+            self._setCoords()
+
+        self._mesh = Mesh(vertices=[],indices=[],mode='triangles',texture=self._texture)
+        self._count = 0
+        self._cache = InstructionGroup()
+        self._cache.add(Color(1,1,1))
+        self._cache.add(self._mesh)
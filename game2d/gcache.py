@@ -0,0 +1,133 @@
+"""
+A cache of text labels for 2D game support.
+
+Making a :class:`GLabel` is slow: it creates a Kivy ``Label``, lays out the text and
+draws it into a new texture.  A game that makes its labels again every frame, even
+when the text has not changed, pays this price 60 times a second for every label.
+
+This module provides the class :class:`GLabelCache`, which hands out the same label
+for the same text and style, so that a label is only made again when its text
+changes.  The cache only keeps the most recently used labels, so text that changes
+all the time (like a score) cannot fill up memory.
+"""
+from collections import OrderedDict
+from .grectangle import GLabel
+
+
+class GLabelCache(object):
+    """
+    A class representing a cache of :class:`GLabel` objects.
+
+    Use the method :meth:`get` in place of the :class:`GLabel` constructor.  Labels are
+    keyed by every keyword except their position, which includes the text, the font
+    name and size, and the color.  A label that is not in the cache is made and added
+    to it; if the cache is then over capacity, the least recently used label is dropped.
+
+    A cached label is shared by every call that asks for it, and each call moves it to
+    the position it asks for.  So you should not draw the same label at two positions
+    in one frame, and you should not change the text or style of a cached label
+    yourself; ask the cache for a new one instead.
+    """
+    #: The keywords that only place a label, and are not part of the key
+    POSITION = ('x','y','left','right','top','bottom')
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The most labels kept in this cache.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._capacity
+
+    @property
+    def hits(self):
+        """
+        The number of calls to :meth:`get` that found their label in the cache.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        The number of calls to :meth:`get` that had to make a new label.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._misses
+
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=64):
+        """
+        Creates a new, empty cache.
+
+        :param capacity: the most labels to keep
+        :type capacity:  ``int`` > 0
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._capacity = capacity
+        self._labels = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        """
+        :return: The number of labels in this cache.
+        :rtype:  ``int``
+        """
+        return len(self._labels)
+
+
+    # PUBLIC METHODS
+    def get(self,**keywords):
+        """
+        Returns a label with the given attributes, from the cache if possible.
+
+        This method takes the same keywords as the :class:`GLabel` constructor, for
+        example::
+
+            cache.get(text='Score: 0',font_size=30,x=90,y=680,linecolor='yellow')
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        key = tuple(sorted((name, self._freeze(value)) for name, value in keywords.items()
+                           if not name in self.POSITION))
+        label = self._labels.get(key)
+        if label is None:
+            self._misses += 1
+            label = GLabel(**keywords)
+            self._labels[key] = label
+            if len(self._labels) > self._capacity:
+                self._labels.popitem(last=False)
+            return label
+
+        self._hits += 1
+        self._labels.move_to_end(key)
+        for name in self.POSITION:
+            if name in keywords and getattr(label,name) != keywords[name]:
+                setattr(label,name,keywords[name])
+        return label
+
+    def clear(self):
+        """
+        Removes every label from this cache.
+        """
+        self._labels.clear()
+
+
+    # HIDDEN METHODS
+    def _freeze(self,value):
+        """
+        Returns a hashable version of a keyword value (lists become tuples).
+
+        :param value: the value to freeze
+        :type value:  any keyword value
+        """
+        if type(value) == list:
+            return tuple(self._freeze(item) for item in value)
+        return value
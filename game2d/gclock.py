@@ -0,0 +1,176 @@
+"""
+A shared animation clock for 2D game support.
+
+A :class:`GSprite` is animated by changing its frame.  Scheduling a timer for every
+animated object costs a Python callback per object per frame, even on frames where
+nothing changes, which adds up for a screen full of sprites.
+
+This module provides the class :class:`GClock`, which plays every animation of a game
+off one clock.  The game advances the clock once per frame with :meth:`GClock.tick`,
+and the clock works out the current frame of every animation at once, with NumPy
+arrays.  Only the objects whose frame actually changed are touched.
+"""
+import numpy as np
+
+
+class GClock(object):
+    """
+    A class representing a clock that plays filmstrip animations.
+
+    An animation shows a sequence of frames of a target, evenly spaced over a given
+    duration, either once or in a loop.  The target is any object with an ``int``
+    attribute ``frame``, such as a :class:`GSprite` or a :class:`GBatch` of a filmstrip.
+    A target plays at most one animation at a time; playing a new one replaces the old.
+    An animation that does not loop stops by itself on its last frame.
+
+    The clock only moves when it is ticked.  So if the game stops ticking the clock
+    (for example, while it is paused), every animation pauses with it.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def time(self):
+        """
+        The number of seconds that this clock has been ticked.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._time
+
+    @property
+    def count(self):
+        """
+        The number of animations playing.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._targets)
+
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new clock at time 0, with no animations.
+        """
+        self._time = 0.0
+        # The animations, as parallel sequences
+        self._targets = []                              # the animated objects
+        self._frames  = []                              # the frames of each, as tuples
+        self._starts  = np.zeros(0)                     # the start times
+        self._steps   = np.zeros(0)                     # the seconds per frame
+        self._lengths = np.zeros(0,dtype=np.intp)       # the number of frames
+        self._loops   = np.zeros(0,dtype=bool)          # whether they loop
+        self._shown   = np.zeros(0,dtype=np.intp)       # the position of the frame shown
+
+
+    # PUBLIC METHODS
+    def play(self,target,frames,duration,loop=False):
+        """
+        Starts an animation of ``target``, replacing any animation it had.
+
+        The first frame is shown at once.  Each frame is then shown for ``duration``
+        divided by the number of frames.
+
+        :param target: the object to animate
+        :type target:  any object with a mutable ``int`` attribute ``frame``
+
+        :param frames: the frame numbers to show, in order
+        :type frames:  non-empty sequence of ``int``
+
+        :param duration: the seconds to show all of the frames once
+        :type duration:  ``int`` or ``float`` > 0
+
+        :param loop: whether to start over after the last frame
+        :type loop:  ``bool``
+        """
+        frames = tuple(frames)
+        assert len(frames) > 0, 'an animation needs at least one frame'
+        assert type(duration) in [int,float] and duration > 0, \
+            '%s is not a valid duration' % repr(duration)
+        self.stop(target)
+
+        self._targets.append(target)
+        self._frames.append(frames)
+        self._starts  = np.append(self._starts,self._time)
+        self._steps   = np.append(self._steps,float(duration)/len(frames))
+        self._lengths = np.append(self._lengths,len(frames))
+        self._loops   = np.append(self._loops,bool(loop))
+        self._shown   = np.append(self._shown,0)
+        target.frame = frames[0]
+
+    def stop(self,target):
+        """
+        Stops the animation of ``target``, if it has one.
+
+        The target keeps the frame that it shows.
+
+        :param target: the animated object
+        :type target:  any object
+        """
+        index = self._find(target)
+        if not index is None:
+            self._remove([index])
+
+    def is_playing(self,target):
+        """
+        Returns True if ``target`` has an animation playing.
+
+        :param target: the object to check
+        :type target:  any object
+        """
+        return not self._find(target) is None
+
+    def tick(self,dt):
+        """
+        Advances this clock by ``dt`` seconds, and updates the frame of every animation.
+
+        The frames of all of the animations are computed in one pass over arrays.
+        Only the targets whose frame changed are assigned a new frame, and animations
+        that have finished are removed.
+
+        :param dt: the seconds since the last tick
+        :type dt:  ``int`` or ``float`` >= 0
+        """
+        self._time += dt
+        if not self._targets:
+            return
+
+        shown = ((self._time-self._starts)/self._steps).astype(np.intp)
+        done  = ~self._loops & (shown >= self._lengths)
+        shown = np.where(self._loops,shown % self._lengths,np.minimum(shown,self._lengths-1))
+        for index in (shown != self._shown).nonzero()[0]:
+            self._targets[index].frame = self._frames[index][shown[index]]
+        self._shown = shown
+        if done.any():
+            self._remove(done.nonzero()[0])
+
+
+    # HIDDEN METHODS
+    def _find(self,target):
+        """
+        Returns the position of the animation of ``target``, or None if it has none.
+
+        :param target: the object to look for
+        :type target:  any object
+        """
+        for index, other in enumerate(self._targets):
+            if other is target:
+                return index
+        return None
+
+    def _remove(self,indices):
+        """
+        Removes the animations at the given positions.
+
+        :param indices: the positions of the animations to remove
+        :type indices:  sequence of ``int``
+        """
+        keep = np.ones(len(self._targets),dtype=bool)
+        keep[indices] = False
+        self._targets = [target for target, kept in zip(self._targets,keep) if kept]
+        self._frames  = [frames for frames, kept in zip(self._frames,keep) if kept]
+        self._starts  = self._starts[keep]
+        self._steps   = self._steps[keep]
+        self._lengths = self._lengths[keep]
+        self._loops   = self._loops[keep]
+        self._shown   = self._shown[keep]
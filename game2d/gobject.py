@@ -31,12 +31,66 @@ def is_color(c):
         return True
 
     if type(c) in [tuple, list] and 3 <= len(c) <= 4:
-        from functools import reduce
-        return reduce(lambda x, y: x and y, map(lambda z: type(z) in [int, float] and 0 <= z <= 1, c))
+        return all(type(z) in (int, float) and 0 <= z <= 1 for z in c)
 
     return type(c) == str and (introcs.is_tkcolor(c) or introcs.is_webcolor(c))
 
 
+#: The colors parsed so far, by their specification (see :func:`parse_color`)
+COLOR_CACHE = {}
+
+#: The most colors kept in the cache before it is emptied
+COLOR_CACHE_SIZE = 1024
+
+
+def parse_color(c):
+    """
+    Returns the color ``c`` as a normalized (r, g, b, a) tuple of floats.
+
+    Parsing a color name or a web color is slow, so colors are interned: the result for
+    a string, tuple or list is cached, and every later call with the same value returns
+    the same tuple without checking or parsing it again.  A sequence is cached by its
+    type and the types of its elements as well as by its value, as ``True == 1`` and an
+    invalid ``(True, 0, 0)`` must not find the color ``(1, 0, 0)``.  Colormodel objects
+    are mutable, so they are converted on every call.  If a game makes many different
+    colors (for example, a fade), the cache is emptied when it gets too large.
+
+    :return: The color as (r, g, b, a)
+    :rtype:  ``tuple`` of 4 floats in 0..1
+
+    :param c: The color to parse
+    :type c:  a value for which :func:`is_color` is True
+    """
+    if type(c) == str:
+        key = c
+    elif type(c) in [tuple, list]:
+        key = (type(c), tuple(c), tuple(map(type, c)))
+    else:
+        key = None
+    try:
+        return COLOR_CACHE[key]
+    except (KeyError, TypeError):
+        pass
+
+    import introcs
+    assert is_color(c), '%s is not a valid color' % repr(c)
+    if type(c) in [introcs.RGB, introcs.HSV]:
+        return tuple(float(v) for v in c.glColor())
+    if type(c) == str:
+        if c[0] == '#':
+            value = introcs.RGB.CreateWebColor(c).glColor()
+        else:
+            value = introcs.RGB.CreateName(c).glColor()
+    else:
+        value = list(c)+[1.0] if len(c) == 3 else c
+    value = tuple(float(v) for v in value)
+
+    if len(COLOR_CACHE) >= COLOR_CACHE_SIZE:
+        COLOR_CACHE.clear()
+    COLOR_CACHE[key] = value
+    return value
+
+
 def is_num_tuple(t,size):
     """
     Checks whether a value is a sequence of numbers.
@@ -53,8 +107,7 @@ def is_num_tuple(t,size):
     :type size:  ``int`` >= 0
     """
     try:
-        from functools import reduce
-        return len(t) == size and reduce(lambda x, y: x and y, map(lambda z: type(z) in [int, float], t))
+        return len(t) == size and all(type(z) in (int, float) for z in t)
     except:
         return False
 
@@ -70,8 +123,7 @@ def is_gobject_list(g):
     :type g:  any
     """
     try:
-        from functools import reduce
-        return len(g) >= 0 and reduce(lambda x, y: x and y, map(lambda z: isinstance(z,GObject), g))
+        return len(g) >= 0 and all(isinstance(z,GObject) for z in g)
     except:
         return False
 
@@ -89,6 +141,18 @@ class GObject(object):
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
     """
+    # A game may hold hundreds of objects, so they have no __dict__.  Every subclass
+    # must list its own attributes in __slots__ (an empty tuple if it adds none).
+    __slots__ = ('_defined','_dirty','_name','_trans','_rotate','_scale','_angle',
+                 '_width','_height','_hwidth','_hheight','_fillcolor','_linecolor',
+                 '_cache','_matrix','_invrse','_mtrue')
+
+    # The parts of the drawing cache that are out of date, as flags in _dirty.  Setters
+    # only raise flags; the cache is brought up to date once, just before it is drawn.
+    _DIRTY_SIZE   = 1   # the size of the shape changed
+    _DIRTY_COLOR  = 2   # a color changed, but not between None and a color
+    _DIRTY_SOURCE = 4   # the image changed
+    _DIRTY_ALL    = 8   # anything else: the cache must be rebuilt
 
     # MUTABLE PROPERTIES
     @property
@@ -137,8 +201,9 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
+        self._hwidth = self._width/2.0
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_SIZE
 
     @property
     def height(self):
@@ -156,8 +221,9 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
+        self._hheight = self._height/2.0
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_SIZE
 
     @property
     def scale(self):
@@ -174,6 +240,8 @@ class GObject(object):
 
         **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
         """
+        if self._scale is None:
+            return (1.0,1.0)
         return (self._scale.x,self._scale.y)
 
     @scale.setter
@@ -182,12 +250,20 @@ class GObject(object):
         assert type(value) in [int,float] or is_num_tuple(value,2), \
                 '%s is not a valid scaling factor' % repr(value)
         if type(value) in [int,float]:
-            self._scale.x = float(value)
-            self._scale.y = float(value)
+            sx = sy = float(value)
         else:
-            self._scale.x = float(value[0])
-            self._scale.y = float(value[1])
+            sx, sy = float(value[0]), float(value[1])
         self._mtrue = False
+        if self._scale is None:
+            # Unscaled objects have no Scale instruction until they need one
+            if sx == 1.0 and sy == 1.0:
+                return
+            self._scale = Scale(sx,sy,1)
+            if self._defined:
+                self._dirty |= self._DIRTY_ALL
+        else:
+            self._scale.x = sx
+            self._scale.y = sy
 
     @property
     def angle(self):
@@ -198,15 +274,24 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._rotate.angle
+        return self._angle
 
     @angle.setter
     def angle(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
-        self._rotate.angle = float(value)
-        if not diff:
+        value = float(value)
+        if value != self._angle:
             self._mtrue = False
+        self._angle = value
+        if self._rotate is None:
+            # Unrotated objects have no Rotate instruction until they need one
+            if value == 0.0:
+                return
+            self._rotate = Rotate(angle=value,axis=(0,0,1))
+            if self._defined:
+                self._dirty |= self._DIRTY_ALL
+        else:
+            self._rotate.angle = value
 
     @property
     def linecolor(self):
@@ -229,21 +314,17 @@ class GObject(object):
 
     @linecolor.setter
     def linecolor(self,value):
-        import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [introcs.RGB, introcs.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = introcs.RGB.CreateWebColor(value).glColor()
-            else:
-                value = introcs.RGB.CreateName(value).glColor()
-
+        if not value is None:
+            value = parse_color(value)
+
+        if self._defined and not self._linecolor is None and not value is None:
+            # Recolor in place, which keeps the drawing cache
+            self._linecolor.rgba = list(value)
+            self._dirty |= self._DIRTY_COLOR
+            return
         self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
 
     @property
     def fillcolor(self):
@@ -267,21 +348,17 @@ class GObject(object):
 
     @fillcolor.setter
     def fillcolor(self,value):
-        import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [introcs.RGB, introcs.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = introcs.RGB.CreateWebColor(value).glColor()
-            else:
-                value = introcs.RGB.CreateName(value).glColor()
-
+        if not value is None:
+            value = parse_color(value)
+
+        if self._defined and not self._fillcolor is None and not value is None:
+            # Recolor in place, which keeps the drawing cache
+            self._fillcolor.rgba = list(value)
+            self._dirty |= self._DIRTY_COLOR
+            return
         self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
 
     @property
     def name(self):
@@ -317,7 +394,7 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x-self.width/2.0
 
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -347,7 +424,7 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x+self.width/2.0
 
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -377,7 +454,7 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y+self.height/2.0
 
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -408,7 +485,7 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y-self.height/2.0
 
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -478,11 +555,18 @@ class GObject(object):
         """
         # Set the properties.
         self._defined = False
+        self._dirty = 0
+        self._hwidth  = None
+        self._hheight = None
+        self._matrix = None
+        self._mtrue = False
 
-        # Create the Kivy transforms for position and size
+        # Create the Kivy transform for position.  Rotation and scaling are rare, so
+        # their transforms are only made when the angle or scale is first changed.
         self._trans  = Translate(0,0,0)
-        self._rotate = Rotate(angle=0,axis=(0,0,1))
-        self._scale  = Scale(1,1,1)
+        self._rotate = None
+        self._scale  = None
+        self._angle  = 0.0
 
         # Now update these with the keywords; size first
         try:
@@ -556,12 +640,40 @@ class GObject(object):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
 
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
 
         p = self.matrix.inverse()._transform(point[0],point[1])
         return abs(p[0]) < self.width/2.0 and abs(p[1]) < self.height/2.0
 
+    def overlaps(self,other):
+        """
+        Checks whether the bounding box of this shape overlaps that of ``other``
+
+        Boxes that only touch along an edge do not overlap.  Unlike four calls to
+        :meth:`contains` with the corners of ``other``, this is also correct when
+        ``other`` is wider or taller than this shape.
+
+        If neither shape is rotated, this method compares the cached half-extents of
+        the two shapes directly.  It allocates nothing and does no argument checking,
+        so it is safe to call for every pair of objects every frame.
+
+        **Warning**: Using this method on a rotated object may slow down your framerate.
+
+        :param other: the shape to check
+        :type other: :class:`GObject`
+
+        :return: True if the bounding boxes overlap
+        :rtype:  ``bool``
+        """
+        if (self._hwidth is not None and other._hwidth is not None and
+            self._angle == 0.0 and other._angle == 0.0):
+            return (abs(self._trans.x-other._trans.x) < self._hwidth+other._hwidth and
+                    abs(self._trans.y-other._trans.y) < self._hheight+other._hheight)
+
+        return (self.left < other.right and other.left < self.right and
+                self.bottom < other.top and other.bottom < self.top)
+
     def transform(self,point):
         """
         Transforms the point to the local coordinate system
@@ -593,33 +705,64 @@ class GObject(object):
         :param view: view to draw to
         :type view:  :class:`GView`
         """
+        if self._dirty:
+            self._flush()
         try:
             view.draw(self._cache)
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
     # HIDDEN METHODS
+    def _flush(self):
+        """
+        Brings the drawing cache up to date with every change since the last flush.
+
+        This is called for you when the object is drawn.  Setting many attributes in a
+        row therefore updates the cache only once.
+        """
+        flags = self._dirty
+        if flags:
+            self._dirty = 0
+            self._update(flags)
+
+    def _update(self,flags):
+        """
+        Updates the parts of the drawing cache that are out of date.
+
+        By default, this rebuilds the cache for any change.  Subclasses override it to
+        update their instructions in place where they can.
+
+        :param flags: the parts that are out of date
+        :type flags:  ``int``, a combination of the ``_DIRTY`` flags
+        """
+        if flags != self._DIRTY_COLOR:
+            self._reset()
+
     def _reset(self):
         """
         Resets the drawing cache.
         """
+        self._dirty = 0
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
-        self._cache.add(self._rotate)
-        self._cache.add(self._scale)
+        if not self._rotate is None:
+            self._cache.add(self._rotate)
+        if not self._scale is None:
+            self._cache.add(self._scale)
 
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
         """
+        sx, sy = self.scale
         self._matrix = Matrix()
         self._matrix.translate(self._trans.x,self._trans.y)
-        self._matrix.rotate(self._rotate.angle)
-        self._matrix.scale(self._scale.x,self._scale.y)
+        self._matrix.rotate(self._angle)
+        self._matrix.scale(sx,sy)
         self._invrse = Matrix()
-        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
-        self._invrse.rotate(-self._rotate.angle)
+        self._invrse.scale(1.0/sx,1.0/sy)
+        self._invrse.rotate(-self._angle)
         self._invrse.translate(-self._trans.x,-self._trans.y)
         self._mtrue = True
 
@@ -642,6 +785,7 @@ class GScene(GObject):
 
     All objects stored in a ``GScene`` are drawn as if the point (x,y) is the origin.
     """
+    __slots__ = ('_children','_caches')
 
     # MUTABLE PROPERTIES
     @property
@@ -661,7 +805,7 @@ class GScene(GObject):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
         self._children = list(value)
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
 
 
     # IMMUTABLE PROPERTIES
@@ -761,5 +905,32 @@ class GScene(GObject):
         """
         GObject._reset(self)
         for x in self.children:
+            x._flush()
             self._cache.add(x._cache)
+        self._caches = [x._cache for x in self.children]
         self._cache.add(PopMatrix())
+
+    def draw(self, view):
+        """
+        Draws this scene, and all of its children, in the provide view.
+
+        Ideally, the view should be the one provided by :class:`GameApp`.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        self._flush()
+        GObject.draw(self,view)
+
+    def _flush(self):
+        """
+        Brings the drawing cache of this scene and all of its children up to date.
+
+        The scene holds the caches of its children, so it is rebuilt if a child had to
+        replace its cache.
+        """
+        for x in self._children:
+            x._flush()
+        if any(x._cache is not cache for x, cache in zip(self._children,self._caches)):
+            self._dirty |= self._DIRTY_ALL
+        GObject._flush(self)
@@ -75,9 +75,8 @@ def is_point_tuple(t,minsize):
     :rtype:  ``bool``
     """
     try:
-        from functools import reduce
         return len(t) % 2 == 0 and len(t) >= 2*minsize and \
-            reduce(lambda x, y: x and y, map(lambda z: type(z) in [int, float], t))
+            all(type(z) in (int, float) for z in t)
     except:
         return False
 
@@ -103,6 +102,7 @@ class GPath(GObject):
     are 0.  However, if they are nonzero, then Python will add them to all of the points
     in the path, shifting the path accordingly.
     """
+    __slots__ = ('_points','_linewidth')
     
     # MUTABLE PROPERTIES
     @property
@@ -120,7 +120,7 @@ class GPath(GObject):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     @property
     def linewidth(self):
@@ -139,7 +139,7 @@ class GPath(GObject):
         assert value >= 0, 'value %s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     
     # IMMUTABLE PROPERTIES
@@ -280,6 +280,7 @@ class GTriangle(GPath):
     will add them to the triangle vertices.  Similarly, the attributes `width` and 
     `height` are immutable, and are computed directly from the points
     """
+    __slots__ = ()
     
     # MUTABLE PROPERTIES
     @property
@@ -298,7 +299,7 @@ class GTriangle(GPath):
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     
     # BUILT-IN METHODS
@@ -397,6 +398,7 @@ class GPolygon(GPath):
     As with :class:`GPath`, the attributes ``width`` and ``height`` are immutable, and 
     are computed directly from the points
     """
+    __slots__ = ('_source','_source_width','_source_height','_mesh','_verts')
     
     # MUTABLE PROPERTIES
     @property
@@ -414,7 +416,7 @@ class GPolygon(GPath):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     @property
     def source(self):
@@ -431,7 +433,7 @@ class GPolygon(GPath):
         assert value is None or GameApp.is_image(value), 'value %s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     @property
     def source_width(self):
@@ -456,7 +458,7 @@ class GPolygon(GPath):
         assert value is None or type(value) in [int,float], 'value %s is not a valid width' % repr(value)
         self._source_width = None
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     @property
     def source_height(self):
@@ -481,7 +483,7 @@ class GPolygon(GPath):
         assert value is None or _is_num(value), 'value %s is not a valid width' % repr(value)
         self._source_height = None
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     
     # BUILT-IN METHODS
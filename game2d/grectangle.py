@@ -12,6 +12,7 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.uix.label import Label
 from kivy.uix.image import Image
+from kivy.graphics.texture import Texture
 from .gobject import GObject
 from .app import GameApp
 
@@ -28,6 +29,7 @@ class GRectangle(GObject):
     The only new property for this class is ``linewidth``, which controls the width of
     the border around the rectangle.  For all other properties, see the documentation
     for :class:`GObject`."""
+    __slots__ = ('_linewidth','_built','_fill','_line')
     
     # MUTABLE PROPERTIES 
     @property
@@ -47,7 +49,7 @@ class GRectangle(GObject):
         assert value >= 0, '%s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_SIZE
     
     
     # BUILT-IN METHODS
@@ -76,6 +78,42 @@ class GRectangle(GObject):
     
     
     # HIDDEN METHODS
+    def _update(self,flags):
+        """
+        Updates the parts of the drawing cache that are out of date.
+        
+        A change of size (or line width) moves the corners of the existing fill and
+        border.  The cache is only rebuilt if the fill or the border had to appear or
+        disappear.
+        
+        :param flags: the parts that are out of date
+        :type flags:  ``int``, a combination of the ``_DIRTY`` flags
+        """
+        if flags & (self._DIRTY_ALL | self._DIRTY_SOURCE) or self._layout() != self._built:
+            self._reset()
+        elif flags & self._DIRTY_SIZE:
+            self._resize()
+    
+    def _layout(self):
+        """
+        Returns which instructions the drawing cache needs, as (fill, border) bools.
+        """
+        return (not self._fillcolor is None,
+                not self._linecolor is None and self.linewidth > 0)
+    
+    def _resize(self):
+        """
+        Moves the corners of the fill and the border to the current size.
+        """
+        x = -self.width/2.0
+        y = -self.height/2.0
+        if not self._fill is None:
+            self._fill.pos  = (x,y)
+            self._fill.size = (self.width, self.height)
+        if not self._line is None:
+            self._line.rectangle = (x,y,self.width,self.height)
+            self._line.width = self.linewidth
+    
     def _reset(self):
         """
         Resets the drawing cache
@@ -83,17 +121,20 @@ class GRectangle(GObject):
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
+        self._built = self._layout()
+        self._fill = None
+        self._line = None
         
         if not self._fillcolor is None:
-            fill = Rectangle(pos=(x,y), size=(self.width, self.height))
+            self._fill = Rectangle(pos=(x,y), size=(self.width, self.height))
             self._cache.add(self._fillcolor)
-            self._cache.add(fill)
+            self._cache.add(self._fill)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
-                        close=True,width=self.linewidth)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
+                              close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
 
@@ -111,6 +152,7 @@ class GEllipse(GRectangle):
     This class has exactly the same properties as :class:`GRectangle`.  See the 
     documentation of that class and :class:`GObject` for a complete list of attributes.
     """
+    __slots__ = ()
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -150,7 +192,7 @@ class GEllipse(GRectangle):
         
         rx = self.width/2.0
         ry = self.height/2.0
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
@@ -162,6 +204,19 @@ class GEllipse(GRectangle):
     
     
     # HIDDEN METHODS
+    def _resize(self):
+        """
+        Moves the bounding box of the fill and the border to the current size.
+        """
+        x = -self.width/2.0
+        y = -self.height/2.0
+        if not self._fill is None:
+            self._fill.pos  = (x,y)
+            self._fill.size = (self.width, self.height)
+        if not self._line is None:
+            self._line.ellipse = (x,y,self.width,self.height)
+            self._line.width = self.linewidth
+    
     def _reset(self):
         """
         Resets the drawing cache.
@@ -169,16 +224,19 @@ class GEllipse(GRectangle):
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
+        self._built = self._layout()
+        self._fill = None
+        self._line = None
         
         if not self._fillcolor is None:
-            fill = Ellipse(pos=(x,y), size=(self.width,self.height))
+            self._fill = Ellipse(pos=(x,y), size=(self.width,self.height))
             self._cache.add(self._fillcolor)
-            self._cache.add(fill)
+            self._cache.add(self._fill)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
+            self._line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
 
@@ -204,6 +262,7 @@ class GImage(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -220,7 +279,7 @@ class GImage(GRectangle):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_SOURCE
     
     
     # BUILT-IN METHODS
@@ -249,6 +308,25 @@ class GImage(GRectangle):
     
     
     # HIDDEN METHODS
+    def _update(self,flags):
+        """
+        Updates the parts of the drawing cache that are out of date.
+        
+        A new source only swaps the texture of the existing rectangle, and a new size 
+        only moves its corners.
+        
+        :param flags: the parts that are out of date
+        :type flags:  ``int``, a combination of the ``_DIRTY`` flags
+        """
+        if flags & self._DIRTY_ALL or self._layout() != self._built:
+            self._reset()
+            return
+        if flags & self._DIRTY_SOURCE:
+            self._texture = GameApp.load_texture(self.source)
+            self._fill.texture = self._texture
+        if flags & self._DIRTY_SIZE:
+            self._resize()
+    
     def _reset(self):
         """
         Resets the drawing cache.
@@ -256,19 +334,148 @@ class GImage(GRectangle):
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
+        self._built = self._layout()
+        self._line = None
         
         self._texture = GameApp.load_texture(self.source)
-        fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
+        self._fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._fill)
+        
+        if not self._linecolor is None and self.linewidth > 0:
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._cache.add(self._linecolor)
+            self._cache.add(self._line)
+        
+        self._cache.add(PopMatrix())
+
+
+# #mark -
+class GBitmap(GRectangle):
+    """
+    A class representing a rectangle filled with an array of pixels.
+    
+    The pixels are stored in the attribute ``pixels``, a NumPy array of bytes with shape 
+    (rows, columns, 4) holding one RGBA color per pixel.  Row 0 is the bottom row of the 
+    image.  The pixels are stretched to the width and height of the rectangle without 
+    smoothing, so every pixel stays a sharp square.
+    
+    Unlike :class:`GImage`, a bitmap does not rebuild its drawing cache when its pixels 
+    change.  The method :meth:`paste` copies a block of new pixels straight into the 
+    texture, so only the changed pixels are sent to the graphics card.  This is the fast 
+    way to draw thousands of tiny shapes that move together as one rectangle.
+    
+    As with :class:`GImage`, if you define ``fillcolor``, this object will tint the pixels 
+    by the given color.
+    """
+    __slots__ = ('_pixels','_texture')
+    
+    # MUTABLE PROPERTIES
+    @property
+    def pixels(self):
+        """
+        The pixels of this bitmap.
+        
+        Changing the contents of this array does not change the bitmap; use the method 
+        :meth:`paste` for that.  Assigning a new array redraws the whole bitmap.
+        
+        **invariant**. Value must be a NumPy ``uint8`` array of shape (rows, columns, 4)
+        """
+        return self._pixels
+    
+    @pixels.setter
+    def pixels(self,value):
+        assert (hasattr(value,'shape') and len(value.shape) == 3 and value.shape[2] == 4 and
+                str(value.dtype) == 'uint8'), '%s is not an array of RGBA bytes' % repr(value)
+        resized = self._pixels is None or value.shape != self._pixels.shape
+        self._pixels = value
+        if self._defined:
+            if resized:
+                self._reset()
+            else:
+                self._texture.blit_buffer(value.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new bitmap.
+        
+        To use the constructor for this class, you should provide it with a list of 
+        keyword arguments that initialize various attributes. For example, to make a 
+        100x100 square from a 10x10 array of pixels, use the constructor::
+            
+            GBitmap(x=0,y=0,width=100,height=100,pixels=numpy.zeros((10,10,4),'uint8'))
+        
+        This class supports the all same keywords as :class:`GRectangle`; the only new 
+        keyword is ``pixels``, which is required.  See the documentation of 
+        :class:`GRectangle` and :class:`GObject` for the other supported keywords.
+        
+        :param keywords: dictionary of keyword arguments 
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._pixels = None
+        self._texture = None
+        self.pixels = keywords['pixels']
+        GRectangle.__init__(self,**keywords)
+        self._defined = True
+    
+    
+    # PUBLIC METHODS
+    def paste(self,block,col,row):
+        """
+        Copies a block of pixels into this bitmap, with its bottom left pixel at (col,row).
+        
+        Only the pixels of the block are sent to the texture, so the cost of this method 
+        depends on the size of the block, not on the size of the bitmap.
+        
+        :param block: the pixels to copy
+        :type block:  NumPy ``uint8`` array of shape (rows, columns, 4)
+        
+        :param col: the column of the bottom left pixel of the block
+        :type col:  ``int`` >= 0
+        
+        :param row: the row of the bottom left pixel of the block
+        :type row:  ``int`` >= 0
+        """
+        height, width = block.shape[:2]
+        self._pixels[row:row+height,col:col+width] = block
+        self._texture.blit_buffer(block.tobytes(),size=(width,height),pos=(col,row),
+                                  colorfmt='rgba',bufferfmt='ubyte')
+    
+    
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        x = -self.width/2.0
+        y = -self.height/2.0
+        
+        self._built = self._layout()
+        self._line = None
+        
+        rows, cols = self._pixels.shape[:2]
+        self._texture = Texture.create(size=(cols,rows),colorfmt='rgba')
+        self._texture.mag_filter = 'nearest'
+        self._texture.min_filter = 'nearest'
+        self._texture.blit_buffer(self._pixels.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+        self._fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
         else:
             self._cache.add(Color(1,1,1))
-        self._cache.add(fill)
+        self._cache.add(self._fill)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
 
@@ -297,6 +504,9 @@ class GLabel(GRectangle):
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
     provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    # The Kivy label calls back a bound method, which it only holds by weak reference
+    __slots__ = ('_label','_fsize','_halign','_valign','_hanchor','_vanchor','_ha','_hv',
+                 '__weakref__')
     
     # MUTABLE PROPERTIES
     @property
@@ -356,12 +566,17 @@ class GLabel(GRectangle):
         lines in the presence of the escape character '\\n'. The `width` and `height` of 
         this label will grow to ensure that the text will fit in the rectangle.
         
+        Assigning the text that the label already has does nothing, so it is cheap to 
+        set the text of a label every frame.
+        
         **Invariant**: Must be a string"""
         return self._label.text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._label.text:
+            return
         self._label.text = value
         self._label.texture_update()
     
@@ -387,7 +602,7 @@ class GLabel(GRectangle):
         self._halign = value
         self._label.halign = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     @property
     def valign(self):
@@ -411,7 +626,7 @@ class GLabel(GRectangle):
         self._valign = value
         self._label.valign = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_ALL
     
     
     # REDEFINED PROPERTIES
@@ -462,7 +677,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x-self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -494,7 +709,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x+self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -526,7 +741,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y+self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -557,7 +772,7 @@ class GLabel(GRectangle):
         **Warning**: Accessing this value on a rotated object may slow down your framerate.
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y-self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -630,13 +845,37 @@ class GLabel(GRectangle):
     def _callback(self,instance=None,value=None):
         """
         A workaround to deal with parameter requirements for callbacks
+        
+        The label is laid out again at once, so that its size is always up to date, 
+        but the drawing cache is only updated when the label is drawn.
         """
         if self._defined:
+            self._place()
+            self._dirty |= self._DIRTY_SIZE
+    
+    def _update(self,flags):
+        """
+        Updates the parts of the drawing cache that are out of date.
+        
+        The text itself is drawn by the Kivy label, which updates itself.  So a new 
+        text or size only lays out the label again and moves the corners of the 
+        background and border.
+        
+        :param flags: the parts that are out of date
+        :type flags:  ``int``, a combination of the ``_DIRTY`` flags
+        """
+        if flags & self._DIRTY_ALL or self._layout() != self._built:
             self._reset()
+            return
+        if flags & self._DIRTY_COLOR and self.linecolor:
+            self._label.color = self.linecolor
+        if flags & self._DIRTY_SIZE:
+            self._place()
+            self._resize()
     
-    def _reset(self):
+    def _place(self):
         """
-        Resets the drawing cache.
+        Lays out the label inside of its box, and the box at its anchor.
         """
         # Set up the label at the center.
         self._label.size = self._label.texture_size
@@ -673,21 +912,29 @@ class GLabel(GRectangle):
             self._label.top = self.height/2.0
         elif self.valign == 'bottom':
             self._label.bottom = -self.height/2.0
-        
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        self._place()
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
+        self._built = self._layout()
+        self._fill = None
+        self._line = None
         
         if self.fillcolor:
-            fill = Rectangle(pos=(x,y), size=(self.width,self.height))
+            self._fill = Rectangle(pos=(x,y), size=(self.width,self.height))
             self._cache.add(self._fillcolor)
-            self._cache.add(fill)
+            self._cache.add(self._fill)
         
         self._cache.add(self._label.canvas)
         
         if self._linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
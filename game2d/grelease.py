@@ -0,0 +1,127 @@
+"""
+A release mode for 2D game support.
+
+Every setter and query of this package checks its arguments with an assert, which
+is a great help while a game is being written: a bad value fails right where it is
+assigned, rather than somewhere deep inside Kivy.  But these checks run on every call,
+and the hot ones (moving an object, testing a point) run many times every frame.
+
+This module provides a release mode, which replaces the hottest methods with versions
+that do not check their arguments.  Nothing else changes: a game that works in debug
+mode works the same in release mode, only faster.  A game that passes a bad value in
+release mode fails later, and with a less helpful error.
+
+Release mode is turned on by :class:`GameApp` with the keyword ``release`` or the
+environment variable ``GAME2D_RELEASE``.  It may also be switched at any time with
+:func:`set_release`, which affects every object, old and new.
+
+The methods replaced are the setters of ``x``, ``y``, ``width`` and ``height`` and the
+method ``contains`` in :class:`GObject`, the setter of ``children`` in :class:`GScene`,
+and the setters of ``points`` in :class:`GPath`, :class:`GTriangle` and
+:class:`GPolygon`.
+"""
+from introcs.geom import Point2
+
+from .gobject import GObject, GScene
+from .gpath import GPath, GTriangle, GPolygon
+
+
+# FAST METHODS
+def _set_x(self,value):
+    self._trans.x = value
+    self._mtrue = False
+
+def _set_y(self,value):
+    self._trans.y = value
+    self._mtrue = False
+
+def _set_width(self,value):
+    self._width = float(value)
+    self._hwidth = self._width/2.0
+    if self._defined:
+        self._dirty |= self._DIRTY_SIZE
+
+def _set_height(self,value):
+    self._height = float(value)
+    self._hheight = self._height/2.0
+    if self._defined:
+        self._dirty |= self._DIRTY_SIZE
+
+def _contains(self,point):
+    if isinstance(point,Point2):
+        point = (point.x,point.y)
+    if self._angle == 0.0:
+        if self._hwidth is not None:
+            return (abs(point[0]-self._trans.x) < self._hwidth and
+                    abs(point[1]-self._trans.y) < self._hheight)
+        return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+
+    p = self.matrix.inverse()._transform(point[0],point[1])
+    return abs(p[0]) < self.width/2.0 and abs(p[1]) < self.height/2.0
+
+def _set_children(self,value):
+    self._children = list(value)
+    if self._defined:
+        self._dirty |= self._DIRTY_ALL
+
+def _set_points(self,value):
+    self._points = tuple(value)
+    if self._defined:
+        self._dirty |= self._DIRTY_ALL
+
+
+#: The fast version of every replaced attribute, by (class, attribute name)
+FAST = {
+    (GObject,'x'): _set_x,
+    (GObject,'y'): _set_y,
+    (GObject,'width'): _set_width,
+    (GObject,'height'): _set_height,
+    (GObject,'contains'): _contains,
+    (GScene,'children'): _set_children,
+    (GPath,'points'): _set_points,
+    (GTriangle,'points'): _set_points,
+    (GPolygon,'points'): _set_points,
+}
+
+#: The original (checked) version of every replaced attribute
+DEBUG = dict((key, key[0].__dict__[key[1]]) for key in FAST)
+
+# Whether release mode is on
+_release = False
+
+
+def is_release():
+    """
+    Returns True if release mode is on.
+
+    :return: True if argument checks are skipped in the hot methods
+    :rtype:  ``bool``
+    """
+    return _release
+
+
+def set_release(flag):
+    """
+    Turns release mode on or off.
+
+    In release mode, the hot methods of this package do not check their arguments.
+    This affects every class at once, so objects that already exist switch too.
+    Turning release mode off again restores the checks.
+
+    :param flag: True to turn release mode on, False to turn it off
+    :type flag:  ``bool``
+    """
+    global _release
+    flag = bool(flag)
+    if flag == _release:
+        return
+    for (cls, name), fast in FAST.items():
+        debug = DEBUG[(cls,name)]
+        if not flag:
+            setattr(cls,name,debug)
+        elif isinstance(debug,property):
+            setattr(cls,name,property(debug.fget,fast,debug.fdel,debug.__doc__))
+        else:
+            fast.__doc__ = debug.__doc__
+            setattr(cls,name,fast)
+    _release = flag
@@ -33,7 +33,15 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are shared: every sprite with the same source and format 
+    uses the same texture regions (see :meth:`load_frames`).  Changing the frame only
+    swaps the texture of the rectangle, so it is cheap to animate many sprites at once.
     """
+    __slots__ = ('_source','_texture','_format','_frame','_images','_bounds')
+    
+    #: The frames made so far, as (texture, regions), by (source, format)
+    FRAME_CACHE = {}
     
     # MUTABLE PROPERTIES
     @property
@@ -50,7 +58,7 @@ class GSprite(GRectangle):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._dirty |= self._DIRTY_SOURCE
     
     @property
     def count(self):
@@ -76,7 +84,7 @@ class GSprite(GRectangle):
         assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
         self._frame = value
         if self._bounds:
-            self._texture = self._images[self._frame]
+            self._texture = self._images[value]
             self._bounds.texture = self._texture
     
     
@@ -89,10 +97,10 @@ class GSprite(GRectangle):
         keyword arguments that initialize various attributes. For example, to load the 
         filmstrip ``alien-strip1.png``, which has 3 rows and 2 columns, use the constructor::
             
-            GSprite(x=0,y=0,width=10,height=10,source='alien-strip1.png',frames=(3,2))
+            GSprite(x=0,y=0,width=10,height=10,source='alien-strip1.png',format=(3,2))
         
         This class supports the all same keywords as :class:`GImage`; the only new 
-        keyword is ``frames``. This keyword specifies the grid size of the animation
+        keyword is ``format``. This keyword specifies the grid size of the animation
         frames in the image.  See the documentation of :class:`GImage` and 
         :class:`GObject` for the other supported keywords.
         
@@ -103,12 +111,52 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
+        self._images = (None,)*self.count
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
         self._defined = True
     
+    # CLASS METHODS
+    @classmethod
+    def load_frames(cls,source,format):
+        """
+        Returns the frames of the filmstrip ``source``, making them if necessary.
+        
+        The frames are regions of the texture of the image, in the order of the frame 
+        numbers (left-to-right, top-to-bottom).  They are made once for every source 
+        and format, and shared by every sprite.  If the texture of the image is loaded
+        again (for example, when the window is made again), the frames are made again.
+        
+        This returns None if the image cannot be loaded.
+        
+        :param source: the image file of the filmstrip
+        :type source:  ``str``
+        
+        :param format: the number of rows and columns of frames
+        :type format:  ``tuple`` of two ints > 0
+        """
+        texture = GameApp.load_texture(source)
+        if texture is None:
+            return None
+        
+        key = (source,format)
+        cached = cls.FRAME_CACHE.get(key)
+        if cached is None or cached[0] is not texture:
+            rows, cols = format
+            width  = texture.width/cols
+            height = texture.height/rows
+            frames = []
+            for row in range(rows):
+                for col in range(cols):
+                    frames.append(texture.get_region(int(col*width),
+                                                     texture.height-int((row+1)*height),
+                                                     int(width),int(height)))
+            cached = (texture,tuple(frames))
+            cls.FRAME_CACHE[key] = cached
+        return cached[1]
+    
+    
     # HIDDEN METHODS
     def _setFormat(self,value):
         """
@@ -122,6 +170,36 @@ class GSprite(GRectangle):
         assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
         self._format = value
     
+    def _load(self):
+        """
+        Loads the shared frames of the current source.
+        """
+        frames = self.load_frames(self.source,self._format)
+        if frames is None:
+            print('Failed to load',repr(self.source))
+            frames = (None,)*self.count
+        self._images = frames
+        self._texture = frames[self._frame]
+    
+    def _update(self,flags):
+        """
+        Updates the parts of the drawing cache that are out of date.
+        
+        A new source only swaps the texture of the existing rectangle, and a new size 
+        only moves its corners.
+        
+        :param flags: the parts that are out of date
+        :type flags:  ``int``, a combination of the ``_DIRTY`` flags
+        """
+        if flags & self._DIRTY_ALL or self._layout() != self._built:
+            self._reset()
+            return
+        if flags & self._DIRTY_SOURCE:
+            self._load()
+            self._bounds.texture = self._texture
+        if flags & self._DIRTY_SIZE:
+            self._resize()
+    
     def _reset(self):
         """
         Resets the drawing cache.
@@ -129,24 +207,12 @@ class GSprite(GRectangle):
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
+        self._built = self._layout()
+        self._line = None
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
-        else:
-            print('Failed to load',repr(self.source))
-        
-        self._texture = self._images[self._frame]
+        self._load()
         self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
+        self._fill = self._bounds
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
         else:
@@ -154,9 +220,9 @@ class GSprite(GRectangle):
         self._cache.add(self._bounds)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
 
@@ -0,0 +1,187 @@
+"""
+Frame-time statistics for 2D game support.
+
+This module provides the class :class:`FrameStats`, which records how long each phase
+of every animation frame takes.  :class:`GameApp` creates one when profiling is turned
+on (see the ``profile`` keyword of that class), and it is available in the attribute
+``stats``.  When profiling is off, no instance exists and nothing is recorded.
+
+The times are kept in ring buffers, so the statistics always describe the most recent
+frames and recording a frame never allocates memory.
+"""
+from array import array
+import math
+
+
+class FrameStats(object):
+    """
+    A class recording the phase times of the most recent animation frames.
+
+    Every frame has six measurements, all in seconds:
+
+        ``clear``:  the time to clear the view
+        ``update``: the time spent in :meth:`GameApp.update`
+        ``draw``:   the time spent in :meth:`GameApp.draw`
+        ``submit``: the time from the end of ``draw`` until Kivy has rendered the frame
+        ``dt``:     the time since the previous frame, as given to ``update``
+        ``jitter``: how far ``dt`` is from the target frame time, in either direction
+
+    A frame is dropped when ``dt`` is more than 1.5 times the target frame time.  A
+    frame that takes as long as k frames counts as k-1 dropped frames.
+    """
+    #: The names of the measured phases, in the order of a frame
+    PHASES = ('clear', 'update', 'draw', 'submit', 'dt', 'jitter')
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of frames kept in the ring buffers.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._capacity
+
+    @property
+    def count(self):
+        """
+        The number of frames recorded so far (not just the ones still kept).
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._count
+
+    @property
+    def dropped(self):
+        """
+        The number of frames dropped so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._dropped
+
+    @property
+    def target(self):
+        """
+        The target frame time in seconds (1/fps).
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._target
+
+
+    # BUILT-IN METHODS
+    def __init__(self,fps=60.0,capacity=600):
+        """
+        Creates a new, empty record of frame times.
+
+        :param fps: the target frames per second
+        :type fps:  ``int`` or ``float`` > 0
+
+        :param capacity: the number of frames to keep
+        :type capacity:  ``int`` > 0
+        """
+        assert type(fps) in [int,float] and fps > 0, '%s is not a valid fps' % repr(fps)
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._capacity = capacity
+        self._target = 1.0/fps
+        self._buffers = dict((phase, array('d',[0.0]*capacity)) for phase in self.PHASES)
+        self._count = 0
+        self._dropped = 0
+
+    def __str__(self):
+        """
+        :return: A readable summary of the statistics, in milliseconds.
+        :rtype:  ``str``
+        """
+        lines = ['%-6s %6s %6s %6s' % ('ms','p50','p95','p99')]
+        for phase in self.PHASES:
+            lines.append('%-6s %6.2f %6.2f %6.2f' % ((phase,)+
+                         tuple(1000*self.percentile(phase,p) for p in (50,95,99))))
+        lines.append('frames %d  dropped %d' % (self._count,self._dropped))
+        return '\n'.join(lines)
+
+
+    # PUBLIC METHODS
+    def record(self,dt,clear,update,draw):
+        """
+        Records the times of a new frame.
+
+        The submit time is not known yet at the end of a frame; it is added with the
+        method :meth:`submit` once Kivy has rendered the frame.
+
+        :param dt: the time since the previous frame
+        :type dt:  ``float`` >= 0
+
+        :param clear: the time to clear the view
+        :type clear:  ``float`` >= 0
+
+        :param update: the time spent in update
+        :type update:  ``float`` >= 0
+
+        :param draw: the time spent in draw
+        :type draw:  ``float`` >= 0
+        """
+        slot = self._count % self._capacity
+        buffers = self._buffers
+        buffers['clear'][slot]  = clear
+        buffers['update'][slot] = update
+        buffers['draw'][slot]   = draw
+        buffers['submit'][slot] = 0.0
+        buffers['dt'][slot]     = dt
+        buffers['jitter'][slot] = abs(dt-self._target)
+        if dt > 1.5*self._target:
+            self._dropped += int(round(dt/self._target))-1
+        self._count += 1
+
+    def submit(self,seconds):
+        """
+        Records the submit time of the last frame.
+
+        :param seconds: the time from the end of draw until the frame was rendered
+        :type seconds:  ``float`` >= 0
+        """
+        if self._count:
+            self._buffers['submit'][(self._count-1) % self._capacity] = seconds
+
+    def percentile(self,phase,p):
+        """
+        Returns the p-th percentile of a phase over the frames kept, in seconds.
+
+        This uses the nearest-rank method, so the result is always one of the recorded
+        times.  It returns 0 if no frame was recorded.
+
+        :param phase: the phase to summarize
+        :type phase:  one of :attr:`PHASES`
+
+        :param p: the percentile
+        :type p:  ``int`` or ``float`` in 0..100
+        """
+        assert phase in self._buffers, '%s is not a valid phase' % repr(phase)
+        assert type(p) in [int,float] and 0 <= p <= 100, '%s is not a percentile' % repr(p)
+        size = min(self._count,self._capacity)
+        if size == 0:
+            return 0.0
+        values = sorted(self._buffers[phase][:size])
+        rank = max(1,int(math.ceil(p/100.0*size)))
+        return values[rank-1]
+
+    def summary(self):
+        """
+        Returns a dictionary of the p50, p95 and p99 of every phase, plus the counts.
+
+        The result maps each phase name to a dictionary with the keys ``'p50'``,
+        ``'p95'`` and ``'p99'`` (in seconds), and the keys ``'frames'`` and
+        ``'dropped'`` to the counts.
+        """
+        result = {'frames': self._count, 'dropped': self._dropped}
+        for phase in self.PHASES:
+            result[phase] = dict(('p%d' % p, self.percentile(phase,p)) for p in (50,95,99))
+        return result
+
+    def reset(self):
+        """
+        Forgets every frame recorded so far.
+        """
+        self._count = 0
+        self._dropped = 0
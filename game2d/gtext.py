@@ -0,0 +1,349 @@
+"""
+Fast text from pre-rendered glyphs for 2D game support.
+
+A :class:`GLabel` lays out its text and draws it into a new texture every time the
+text changes.  That is fine for a title, but slow for a number that changes every
+frame, like a score or a timer.
+
+This module draws text the way old arcade machines did.  A :class:`GFont` draws every
+printable character of a TrueType font into one texture, once.  A :class:`GText` then
+shows a string as one textured quad per character, all in a single Kivy ``Mesh``.
+Changing the text only rewrites the vertices of the mesh; nothing is laid out or drawn
+into a texture again.
+
+The glyphs are drawn with the Python Imaging Library (Pillow), which must be installed
+to use this module.
+"""
+# Basic Kivy Modules
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.graphics.texture import Texture
+import numpy as np
+import math
+import os
+
+from .gobject import GObject
+from .app import GameApp
+
+
+class GFont(object):
+    """
+    A class representing a TrueType font drawn into a texture at a single point size.
+
+    Fonts are shared: use the class method :meth:`load` rather than the constructor, so
+    that every :class:`GText` with the same font and size uses the same texture.
+
+    Every glyph is a cell of the same height (the line height of the font) and of the
+    width of its ink.  The text is laid out by the advance of each character, which may
+    be a little less than the width of its cell for slanted or overhanging glyphs.
+    Characters that are not in :attr:`CHARS` are drawn as a question mark.
+    """
+    #: The characters drawn into the texture: all of printable ASCII
+    CHARS = ''.join(chr(code) for code in range(32,127))
+    #: The width of the texture in pixels
+    TEXTURE_WIDTH = 512
+    #: The fonts made so far, by (font name, font size)
+    FONT_CACHE = {}
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The file name of the font, in the folder **Fonts**.
+
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts
+        """
+        return self._name
+
+    @property
+    def font_size(self):
+        """
+        The size of the font in points.
+
+        **Invariant**: Must be an int > 0
+        """
+        return self._size
+
+    @property
+    def line_height(self):
+        """
+        The height of a line of text (and of every glyph cell) in pixels.
+
+        **Invariant**: Must be an int > 0
+        """
+        return self._line
+
+    @property
+    def texture(self):
+        """
+        The texture holding every glyph.
+
+        It is made the first time it is needed, as it needs a graphics window.
+
+        **Invariant**: Must be a Kivy ``Texture``
+        """
+        if self._texture is None:
+            rows, cols = self._pixels.shape[:2]
+            self._texture = Texture.create(size=(cols,rows),colorfmt='rgba')
+            self._texture.blit_buffer(self._pixels.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+        return self._texture
+
+
+    # CLASS METHODS
+    @classmethod
+    def load(cls,font_name,font_size):
+        """
+        Returns the font for the given file and size, making it if necessary.
+
+        :param font_name: the file name of the font, in the folder **Fonts**
+        :type font_name:  ``str``
+
+        :param font_size: the size of the font in points
+        :type font_size:  ``int`` > 0
+        """
+        key = (font_name,font_size)
+        if not key in cls.FONT_CACHE:
+            cls.FONT_CACHE[key] = cls(font_name,font_size)
+        return cls.FONT_CACHE[key]
+
+
+    # BUILT-IN METHODS
+    def __init__(self,font_name,font_size):
+        """
+        Draws every glyph of a font into a new array of pixels.
+
+        You should use :meth:`load` instead, which shares fonts.
+
+        :param font_name: the file name of the font, in the folder **Fonts**
+        :type font_name:  ``str``
+
+        :param font_size: the size of the font in points
+        :type font_size:  ``int`` > 0
+        """
+        from PIL import Image, ImageDraw, ImageFont
+        assert GameApp.is_font(font_name), '%s is not a font name' % repr(font_name)
+        assert type(font_size) == int and font_size > 0, '%s is not a valid size' % repr(font_size)
+        self._name = font_name
+        self._size = font_size
+        self._texture = None
+
+        font = ImageFont.truetype(os.path.join(GameApp.fonts,font_name),font_size)
+        ascent, descent = font.getmetrics()
+        self._line = ascent+descent
+
+        # Lay out the cells in shelves, left to right and top to bottom, 1 pixel apart
+        widths  = [max(1,int(math.ceil(font.getlength(ch))),font.getbbox(ch)[2])
+                   for ch in self.CHARS]
+        places  = []
+        x, y = 0, 0
+        for width in widths:
+            if x+width > self.TEXTURE_WIDTH:
+                x, y = 0, y+self._line+1
+            places.append((x,y))
+            x += width+1
+        height = y+self._line
+
+        image = Image.new('L',(self.TEXTURE_WIDTH,height),0)
+        draw = ImageDraw.Draw(image)
+        for ch, (x, y) in zip(self.CHARS,places):
+            draw.text((x,y),ch,font=font,fill=255)
+
+        # White glyphs whose alpha is the ink; flipped so that row 0 is the bottom
+        self._pixels = np.full((height,self.TEXTURE_WIDTH,4),255,dtype=np.uint8)
+        self._pixels[:,:,3] = np.flipud(np.asarray(image,dtype=np.uint8))
+
+        # The advance, width and texture coordinates (u0, v0, u1, v1) of every glyph
+        self._advances = np.array([font.getlength(ch) for ch in self.CHARS],dtype=np.float32)
+        self._widths = np.array(widths,dtype=np.float32)
+        self._uvs = np.array([(x/self.TEXTURE_WIDTH,(height-y-self._line)/height,
+                               (x+w)/self.TEXTURE_WIDTH,(height-y)/height)
+                              for (x, y), w in zip(places,widths)],dtype=np.float32)
+
+
+    # PUBLIC METHODS
+    def codes(self,text):
+        """
+        Returns the glyph numbers of the characters of ``text``, as a NumPy array.
+
+        :param text: the text to look up
+        :type text:  ``str``
+        """
+        codes = np.frombuffer(text.encode('ascii','replace'),dtype=np.uint8).astype(np.intp)-32
+        codes[(codes < 0) | (codes >= len(self.CHARS))] = ord('?')-32
+        return codes
+
+    def measure(self,text):
+        """
+        Returns the width of ``text`` in pixels, when drawn in this font.
+
+        :param text: the text to measure
+        :type text:  ``str``
+        """
+        return float(self._advances[self.codes(text)].sum())
+
+    def layout(self,text):
+        """
+        Returns the vertices of ``text``, centered on the origin.
+
+        The result is a NumPy array of shape (len(text), 4, 4), with the corners (x, y,
+        u, v) of each glyph counter-clockwise from the bottom left.
+
+        :param text: the text to lay out
+        :type text:  ``str``
+        """
+        codes = self.codes(text)
+        advances = self._advances[codes]
+        lefts  = np.cumsum(advances)-advances-advances.sum()/2
+        rights = lefts+self._widths[codes]
+        bottom = -self._line/2.0
+        top    = self._line/2.0
+        uvs = self._uvs[codes]
+
+        vertices = np.empty((len(codes),4,4),dtype=np.float32)
+        vertices[:,0,0] = lefts
+        vertices[:,1,0] = rights
+        vertices[:,2,0] = rights
+        vertices[:,3,0] = lefts
+        vertices[:,0:2,1] = bottom
+        vertices[:,2:4,1] = top
+        vertices[:,0,2:] = uvs[:,(0,1)]
+        vertices[:,1,2:] = uvs[:,(2,1)]
+        vertices[:,2,2:] = uvs[:,(2,3)]
+        vertices[:,3,2:] = uvs[:,(0,3)]
+        return vertices
+
+
+# #mark -
+class GText(GObject):
+    """
+    A class representing a single line of text drawn from pre-rendered glyphs.
+
+    This object is like a :class:`GLabel` without a box: the attribute ``text`` is the
+    string shown, ``linecolor`` is the color of the text, and the ``width`` and
+    ``height`` of the object are those of the text.  The text is centered on the
+    position of the object.
+
+    Unlike :class:`GLabel`, changing the text does not draw a new texture, so a
+    :class:`GText` is the right choice for text that changes often, like a score.  In
+    return, it only supports one line, the characters of printable ASCII, and no
+    alignment, bold or background.  The font and size cannot change after the text is
+    made.
+    """
+    __slots__ = ('_font','_text','_mesh','_indices','_vertices')
+
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text shown.
+
+        Assigning the text that is already shown does nothing.
+
+        **Invariant**: Must be a string
+        """
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._text:
+            return
+        self._text = value
+        self._defined, defined = False, self._defined
+        self.width  = max(1.0,self._font.measure(value))
+        self._defined = defined
+        if self._defined:
+            self._place()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The file name of the font, in the folder **Fonts**.
+
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts
+        """
+        return self._font.font_name
+
+    @property
+    def font_size(self):
+        """
+        The size of the font in points.
+
+        **Invariant**: Must be an int > 0
+        """
+        return self._font.font_size
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new line of text.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to show the
+        score in yellow, use the constructor call::
+
+            GText(text='Score: 0',font_name='Arcade.ttf',font_size=30,x=90,y=680,
+                  linecolor='yellow')
+
+        This class supports the same keywords as :class:`GObject`, except ``width`` and
+        ``height``, plus ``text``, ``font_name`` (required) and ``font_size`` (which
+        defaults to 20).  The color of the text defaults to black.
+        """
+        self._defined = False
+        self._font = GFont.load(keywords['font_name'],keywords.get('font_size',20))
+        self._text = None
+        self._mesh = None
+
+        sized = dict(keywords)
+        sized['width']  = max(1.0,self._font.measure(keywords.get('text','')))
+        sized['height'] = float(self._font.line_height)
+        GObject.__init__(self,**sized)
+        self.text = keywords.get('text','')
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+        self._reset()
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+
+    # HIDDEN METHODS
+    def _place(self):
+        """
+        Rewrites the vertices of the mesh for the current text.
+        """
+        if not self._text:
+            self._mesh.indices = []
+            self._mesh.vertices = []
+            return
+        count = len(self._text)
+        self._vertices = self._font.layout(self._text).reshape(-1)
+        self._mesh.vertices = self._vertices
+        if len(self._indices) < 6*count:
+            self._indices = (np.arange(count,dtype=np.uint16)[:,None]*4+
+                             np.array((0,1,2,2,3,0),dtype=np.uint16)).ravel()
+        self._mesh.indices = self._indices[:6*count]
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._indices = np.zeros(0,dtype=np.uint16)
+        self._mesh = Mesh(vertices=[],indices=[],mode='triangles',texture=self._font.texture)
+        self._place()
+        self._cache.add(self._linecolor)
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
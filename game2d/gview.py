@@ -319,6 +319,16 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    Alternatively, you can attach an object to the view with :meth:`add`.  The view
+    then draws it every frame until you :meth:`remove` it, without any call to
+    :meth:`draw`.  Attached objects are drawn in order of their depth ``z``, and below
+    everything drawn with :meth:`draw`.
+
+    Either way, the view is retained behind the scenes.  At the end of every frame it
+    compares what was drawn to the previous frame, and only changes the Kivy canvas
+    for the objects that appeared, disappeared or changed order.  A frame that draws
+    the same objects as the last one does not touch the canvas at all.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
@@ -341,6 +351,11 @@ class GView(FloatLayout):
         self.bind(size=self._reset)
         self._reset()
         self._contents = set()
+        self._drawn = []
+        self._shown = []
+        self._scene = []
+        self._depth = {}
+        self._order = 0
 
 
     # PUBLIC METHODS
@@ -355,7 +370,7 @@ class GView(FloatLayout):
         :type cmd:  A Kivy graphics command
         """
         if not cmd in self._contents:
-            self._frame.add(cmd)
+            self._drawn.append(cmd)
             self._contents.add(cmd)
 
     def clear(self):
@@ -363,12 +378,101 @@ class GView(FloatLayout):
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  It does
+        not remove the objects attached with :meth:`add`.
         """
-        self._frame.clear()
+        self._drawn = []
         self._contents.clear()
 
+    def add(self,obj,z=0):
+        """
+        Attaches a :class:`GObject` to this view, so that it is drawn every frame.
+
+        Objects with a larger depth ``z`` are drawn on top of those with a smaller one;
+        objects with the same depth are drawn in the order they were added.  Adding an
+        object that is already attached only changes its depth.
+
+        :param obj: the object to attach
+        :type obj:  :class:`GObject`
+
+        :param z: the depth of the object
+        :type z:  ``int`` or ``float``
+        """
+        if obj in self._depth:
+            self.remove(obj)
+        self._order += 1
+        self._depth[obj] = (z,self._order)
+        self._scene.append(obj)
+        self._scene.sort(key=self._depth.__getitem__)
+
+    def remove(self,obj):
+        """
+        Detaches a :class:`GObject` from this view.
+
+        Nothing happens if the object is not attached.
+
+        :param obj: the object to detach
+        :type obj:  :class:`GObject`
+        """
+        if self._depth.pop(obj,None) is not None:
+            self._scene.remove(obj)
+
+    def contains(self,obj):
+        """
+        Returns True if the :class:`GObject` is attached to this view.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        return obj in self._depth
+
     # HIDDEN METHODS
+    def _commit(self):
+        """
+        Brings the Kivy canvas up to date with the frame just drawn.
+
+        This method is called for you by :class:`GameApp` at the end of the animation
+        frame.  Commands that were drawn in the last frame too stay on the canvas.  If
+        the commands that are still there kept their order, only the new commands are
+        inserted and the missing ones removed.  Otherwise the canvas is rebuilt.
+        """
+        if self._scene:
+            # An object replaces its cache when it resets, so read it every frame
+            for obj in self._scene:
+                obj._flush()
+            frame = [obj._cache for obj in self._scene]
+            attached = set(frame)
+            frame.extend(cmd for cmd in self._drawn if not cmd in attached)
+            now = set(frame)
+        else:
+            frame = self._drawn
+            now = self._contents
+        shown = self._shown
+        if frame == shown:
+            return
+
+        kept = []
+        for cmd in shown:
+            if cmd in now:
+                kept.append(cmd)
+            else:
+                self._frame.remove(cmd)
+
+        before = set(kept)
+        pos = 0
+        for index, cmd in enumerate(frame):
+            if pos < len(kept) and kept[pos] is cmd:
+                pos += 1
+            elif not cmd in before:
+                self._frame.insert(index,cmd)
+            else:
+                # An old command moved, so we cannot patch the canvas in place
+                self._frame.clear()
+                for cmd in frame:
+                    self._frame.add(cmd)
+                break
+        self._shown = frame
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -5,25 +5,29 @@ This module contains the model classes for the Alien Invaders game. Anything tha
 interact with on the screen is model: the ship, the laser bolts, and the aliens.
 
 Just because something is a model does not mean there has to be a special class for
-it.  Unless you need something special for your extra gameplay features, Ship and Aliens
-could just be an instance of GImage that you move across the screen. You only need a new
+it.  Unless you need something special for your extra gameplay features, Ship could
+just be an instance of GSprite that you move across the screen. You only need a new
 class when you add extra features to an object. So technically Bolt, which has a velocity,
 is really the only model that needs to have its own class.
 
-With that said, we have included the subclasses for Ship and Aliens.  That is because
-there are a lot of constants in consts.py for initializing the objects, and you might
-want to add a custom initializer.  With that said, feel free to keep the pass underneath
-the class definitions if you do not want to do that.
+With that said, we have included the subclass for Ship.  That is because there are a
+lot of constants in consts.py for initializing the objects, and you might want to add a
+custom initializer.  The aliens have no class: Wave draws all of them as one GBatch of
+the alien filmstrips, which is much faster than a sprite per alien.
 
 You are free to add even more models to this module.  You may wish to do this when you
 add new features to your game, such as power-ups.  If you are unsure about whether to
 make a new class or not, please ask on Piazza.
 
+To save memory, game objects have no __dict__.  A model that adds an attribute must
+list its name in the __slots__ of its class, like Bolt does for its velocity.
+
 Author: Antony Kariuki, akk85
 Date Completed: 12/03/2021
 """
 from consts import *
 from game2d import *
+import numpy as np
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than
 # consts.py.  If you need extra information from Gameplay, then it should be
@@ -31,7 +35,7 @@ from game2d import *
 # calls the method.
 
 
-class Ship(GImage):
+class Ship(GSprite):
     """
     A class to represent the game ship.
 
@@ -42,19 +46,18 @@ class Ship(GImage):
     changing the x attribute (which you can do directly), you want to prevent the player
     from moving the ship offscreen.  This is an ideal thing to do in a method.
 
-    You also MIGHT want to add code to detect a collision with a bolt. We do not require
-    this.  You could put this method in Wave if you wanted to.  But the advantage of
-    putting it here is that Ships and Aliens collide with different bolts.  Ships
-    collide with Alien bolts, not Ship bolts.  And Aliens collide with Ship bolts, not
-    Alien bolts. An easy way to keep this straight is for this class to have its own
-    collision method.
+    There is no collision method here.  The engine (see engine.py) tests the bolts
+    against the ship and the aliens, all at once, and Wave only draws the result.
 
     However, there is no need for any more attributes other than those inherited by
-    GImage. You would only add attributes if you needed them for extra gameplay
-    features (like animation). If you add attributes, list them below.
+    GSprite. The ship is a filmstrip (SHIP_IMAGE): frame 0 is the ship, and the frames
+    SHIP_DEATH show it exploding.  Wave plays the explosion with its animation clock,
+    so the ship needs no attributes of its own for it. If you add attributes, list
+    them below.
 
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     """
+    __slots__ = ()
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getX(self):
@@ -93,114 +96,91 @@ class Ship(GImage):
         Initializes a new Ship object.
         """
         super().__init__(x=GAME_WIDTH/2, y= SHIP_BOTTOM + SHIP_HEIGHT/2,
-        width=SHIP_WIDTH, height=SHIP_HEIGHT, source='ship.png')
-
-    # METHOD TO CHECK FOR COLLISIONS
-    def collides(self,bolt):
-        """
-        Returns: True if the bolt was fired by the player and collides with the ship
-
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        x1 = bolt.getX() - BOLT_WIDTH/2
-        x2 = bolt.getX() + BOLT_WIDTH/2
-        y1 = bolt.getY() - BOLT_HEIGHT/2
-        y2 = bolt.getY() + BOLT_HEIGHT/2
-
-        if (self.contains((x1, y1)) or self.contains((x1,y2)) or
-        self.contains((x2,y1)) or self.contains((x2,y2))):
-            return True
-        return False
+        width=SHIP_WIDTH, height=SHIP_HEIGHT, source=SHIP_IMAGE, format=SHIP_FORMAT)
 
 
-class Alien(GImage):
+class Swarm(GBitmap):
     """
-    A class to represent a single alien.
+    A class to represent the whole block of aliens in swarm mode.
 
-    At the very least, you want a __init__ method to initialize the alien dimensions.
-    These dimensions are all specified in consts.py.
-
-    You also MIGHT want to add code to detect a collision with a bolt. We do not require
-    this.  You could put this method in Wave if you wanted to.  But the advantage of
-    putting it here is that Ships and Aliens collide with different bolts.  Ships
-    collide with Alien bolts, not Ship bolts.  And Aliens collide with Ship bolts, not
-    Alien bolts. An easy way to keep this straight is for this class to have its own
-    collision method.
+    With tens of thousands of aliens, one GImage per alien is far too slow to draw.  A
+    Swarm draws the block as a single bitmap instead, with a square of pixels for each
+    live alien (colored by its band of rows, bottom to top, like ALIEN_IMAGES).  The
+    bitmap has one pixel per screen pixel, so the separation between aliens shows.
 
-    However, there is no need for any more attributes other than those inherited by
-    GImage. You would only add attributes if you needed them for extra gameplay
-    features (like giving each alien a score value). If you add attributes, list
-    them below.
+    Moving the block only moves the bitmap.  Killing an alien pastes a blank square
+    over it, so the cost of a frame depends on the number of kills, not on the number
+    of aliens.
 
-    LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    INSTANCE ATTRIBUTES:
+        _size:   the width and height of an alien [int > 0]
+        _hpitch: the horizontal distance between alien centers [int > 0]
+        _vpitch: the vertical distance between alien centers [int > 0]
+        _blank:  the pixels of a dead alien [uint8 array (size, size, 4)]
     """
+    __slots__ = ('_size','_hpitch','_vpitch','_blank')
 
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getX(self):
-        """
-        Returns the x-coordinate of this alien.
+    # INITIALIZER TO CREATE THE BLOCK
+    def __init__(self, rows, cols, size, sep):
         """
-        return self.x
+        Initializes a full block of rows x cols aliens.
 
-    def getY(self):
-        """
-        Returns the y-coordinate of this alien.
-        """
-        return self.y
+        The block starts at the origin; use setBlock to place it.
 
-    def setX(self, value):
-        """
-        Sets the x-coordinate of this alien.
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
 
-        Parameter value: the new y-coordinate of the ship
-        Precondition: value is a number (int or float)
-        """
-        self.x = value
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
 
-    def setY(self, value):
-        """
-        Sets the y-coordinate of this alien.
+        Parameter size: the width and height of an alien
+        Precondition: size is an int > 0
 
-        Parameter value: the new y-coordinate of the ship
-        Precondition: value is a number (int or float)
+        Parameter sep: the separation between aliens
+        Precondition: sep is an int >= 0
         """
-        self.y = value
+        self._size = size
+        self._hpitch = size+sep
+        self._vpitch = size+sep
+        self._blank = np.zeros((size, size, 4), dtype=np.uint8)
 
-    # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self,x,y,picture):
-        """
-        Initializes a new Alien object with a center (x,y).
+        # One cell of pitch x pitch pixels per alien, with the alien in its bottom left
+        band = np.arange(rows)*len(SWARM_COLORS)//rows
+        cells = np.array(SWARM_COLORS, dtype=np.uint8)[band]
+        pixels = np.repeat(np.repeat(cells[:,None,:], cols, axis=1), self._vpitch, axis=0)
+        pixels = np.repeat(pixels, self._hpitch, axis=1)
+        cell = np.arange(pixels.shape[0]) % self._vpitch < size
+        pixels[~cell] = 0
+        cell = np.arange(pixels.shape[1]) % self._hpitch < size
+        pixels[:,~cell] = 0
+        super().__init__(x=0, y=0, width=pixels.shape[1], height=pixels.shape[0],
+        pixels=pixels)
 
-        Parameter x: the x-coordinate of the center of the alien
-        Precondition: x is a number (int or float); 0 <= x <= GAME_WIDTH/2
+    # METHODS TO SYNC WITH THE ENGINE
+    def setBlock(self, x, y):
+        """
+        Moves the block so that the bottom left alien is centered at (x,y).
 
-        Parameter y: the y-coordinate of the center of the alien
-        Precondition: y is a number (int or float); 0 <= y <= GAME_HEIGHT/2
+        Parameter x: the x-coordinate of the center of the bottom left alien
+        Precondition: x is a number (int or float)
 
-        Parameter picture: the image of the alien
-        Precondition: picture is a png file
+        Parameter y: the y-coordinate of the center of the bottom left alien
+        Precondition: y is a number (int or float)
         """
-        super().__init__(x=x, y=y, width=ALIEN_WIDTH, height=ALIEN_HEIGHT,
-        source=picture)
+        self.x = x - self._size/2 + self.width/2
+        self.y = y - self._size/2 + self.height/2
 
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,bolt):
+    def kill(self, row, col):
         """
-        Returns: True if the bolt was fired by the player and collides with this alien
+        Erases the alien at (row, col).
 
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        x1 = bolt.getX() - BOLT_WIDTH/2
-        x2 = bolt.getX() + BOLT_WIDTH/2
-        y1 = bolt.getY() - BOLT_HEIGHT/2
-        y2 = bolt.getY() + BOLT_HEIGHT/2
+        Parameter row: the row of the alien (0 is the bottom row)
+        Precondition: row is an int in 0..rows-1
 
-        if (self.contains((x1, y1)) or self.contains((x1,y2)) or
-        self.contains((x2,y1)) or self.contains((x2,y2))):
-            return True
-        return False
+        Parameter col: the column of the alien (0 is the leftmost column)
+        Precondition: col is an int in 0..cols-1
+        """
+        self.paste(self._blank, col*self._hpitch, row*self._vpitch)
 
 
 class Bolt(GRectangle):
@@ -229,6 +209,7 @@ class Bolt(GRectangle):
 
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     """
+    __slots__ = ('_velocity',)
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getX(self):
@@ -249,6 +230,17 @@ class Bolt(GRectangle):
         """
         return self._velocity
 
+    def setVel(self, value):
+        """
+        Sets the velocity of this bolt.
+
+        This is only used when a Bolt is reused for a new shot.
+
+        Parameter value: the new velocity of the bolt
+        Precondition: value is a number (int or float)
+        """
+        self._velocity = value
+
     def setX(self, value):
         """
         Sets the x-coordinate of this bolt.
@@ -8,6 +8,11 @@ new level, you are expected to make a new instance of the class.
 The subcontroller Wave manages the ship, the aliens and any laser bolts on screen.
 These are model objects.  Their classes are defined in models.py.
 
+The rules of the wave live in the headless WaveEngine (engine.py).  Wave owns an
+engine, forwards the user input to it, and copies the engine state into the models
+that it draws.  That way the visible game and the headless simulation can never
+disagree about the rules.
+
 Most of your work on this assignment will be in either this module or models.py.
 Whether a helper method belongs in this module or models.py is often a complicated
 issue.  If you do not know, ask on Piazza and we will answer.
@@ -19,7 +24,8 @@ Date Completed: 12/03/2021
 from game2d import *
 from consts import *
 from models import *
-import random
+from engine import *
+import numpy as np
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not permitted
@@ -37,18 +43,29 @@ class Wave(object):
     should create a NEW instance of Wave (in Invaders) if you want to make a new wave of
     aliens.
 
+    The rules themselves are simulated by a WaveEngine, which works on plain data.
+    This class is the render adapter for that engine: after every update it copies
+    the engine state into the models below, and plays a sound for every engine event.
+
+    The ship and the aliens are filmstrips.  One animation clock (a GClock) plays all of
+    their animations: the aliens walk in a loop, and the ship explodes when it is hit.
+    The clock is ticked once per update, so the animations pause with the game.
+
     If you want to pause the game, tell this controller to draw, but do not update.  See
     subcontrollers.py from Lecture 24 for an example.  This class will be similar to
     than one in how it interacts with the main class Invaders.
 
-    #UPDATE ME LATER
     INSTANCE ATTRIBUTES:
-        _ship:   the player ship to control [Ship]
-        _aliens: the 2d list of aliens in the wave [rectangular 2d list of Alien or None]
-        _bolts:  the laser bolts currently on screen [list of Bolt, possibly empty]
+        _engine: the headless simulation of this wave [WaveEngine]
+        _ship:   the player ship to control [Ship, or None once destroyed and exploded]
+        _dying:  whether the ship is playing its explosion [bool]
+        _clock:  the clock that plays the ship and alien animations [GClock]
+        _aliens: the live aliens, as a batch per picture and the records it draws
+                 [list of (GBatch, int array) pairs; empty in swarm mode]
+        _swarm:  the block of aliens in swarm mode [Swarm, or None in the normal game]
+        _blockPos: the engine position of the bottom left alien when last synced [tuple]
+        _bolts:  the Bolt for each slot of the engine bolt pool [list of Bolt or None]
         _dline:  the defensive line being protected [GPath]
-        _lives:  the number of lives left  [int >= 0]
-        _time:   The amount of time since the last Alien "step" [number >= 0]
 
     As you can see, all of these attributes are hidden.  You may find that you want to
     access an attribute in class Invaders. It is okay if you do, but you MAY NOT ACCESS
@@ -56,16 +73,7 @@ class Wave(object):
     you need to access in Invaders.  Only add the getters and setters that you need for
     Invaders. You can keep everything else hidden.
 
-    You may change any of the attributes above as you see fit. For example, may want to
-    keep track of the score.  You also might want some label objects to display the score
-    and number of lives. If you make changes, please list the changes with the invariants.
-
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-        _direction: the current direction of the wave [str; 'left','right', or 'down']
-        _stepsToFire: the number of steps should take before any alien shoot a bolt [int]
-        _aliensLeft: the number of aliens left [int]
-        _waveSpeed: the number of seconds between alien steps [0 < float <= 1]
-        _score: the current score of the player [int]
         _sound: states whether the sound is on or off [bool]
         _popSound: sound when an alien is killed [Sound object]
         _blastSound: sound when the ship is destroyed [Sound object]
@@ -78,11 +86,13 @@ class Wave(object):
         """
         Returns the number of the player's lives left.
         """
-        return self._lives
+        return self._engine.getLives()
 
     def getShip(self):
         """
-        Returns the ship.
+        Returns the ship, or None once it has been destroyed.
+
+        A destroyed ship is still returned while it plays its explosion.
         """
         return self._ship
 
@@ -90,13 +100,19 @@ class Wave(object):
         """
         Returns the number of aliens left.
         """
-        return self._aliensLeft
+        return self._engine.getAliensLeft()
 
     def getScore(self):
         """
         Returns the player's score.
         """
-        return self._score
+        return self._engine.getScore()
+
+    def getEngine(self):
+        """
+        Returns the headless simulation of this wave.
+        """
+        return self._engine
 
     def getSound(self):
         """
@@ -108,7 +124,9 @@ class Wave(object):
         """
         Creates a new Ship object.
         """
+        self._engine.setShip()
         self._ship = Ship()
+        self._dying = False
 
     def setSound(self, value):
         """
@@ -120,27 +138,41 @@ class Wave(object):
         self._sound = value
 
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, speed=ALIEN_SPEED, swarm=False):
         """
         Initializes a new Wave object.
+
+        In swarm mode the wave ignores rows, cols and speed, and plays the swarm of the
+        engine function newSwarm instead.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
+
+        Parameter speed: the initial number of seconds between alien steps
+        Precondition: speed is a number > 0
+
+        Parameter swarm: whether to play in swarm mode
+        Precondition: swarm is a bool
         """
-        self._blockAliens()
+        if swarm:
+            self._engine = newSwarm()
+        else:
+            self._engine = WaveEngine(rows=rows, cols=cols, speed=speed)
+        self._clock = GClock()
+        self._blockAliens(swarm)
         self._ship = Ship()
+        self._dying = False
         self._dline = GPath(points=[0, DEFENSE_LINE, GAME_WIDTH, DEFENSE_LINE],
         linewidth = 0.5, linecolor = 'gray')
-        self._bolts = []
-        self._time = 0
-        self._direction = 'right'
-        self._stepsToFire = random.randint(1,BOLT_RATE)
-        self._lives = SHIP_LIVES
-        self._aliensLeft = ALIEN_ROWS * ALIENS_IN_ROW
-        self._score = 0
+        self._bolts = [None]*self._engine.getBolts().getCapacity()
         self._popSound = Sound(POP_SOUND)
         self._blastSound = Sound(BLAST_SOUND)
         self._pewShipSound = Sound(SHIP_PEW)
         self._pewAlienSound = Sound(ALIEN_PEW)
         self._sound = True
-        self._waveSpeed = ALIEN_SPEED
 
     #NON-HIDDEN METHODS
 
@@ -155,9 +187,12 @@ class Wave(object):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self._shipController(user_input)
-        self._alienController(dt)
-        self._boltsController()
+        self._engine.update(user_input, dt)
+        self._playEvents()
+        self._clock.tick(dt)
+        self._syncShip()
+        self._syncAliens()
+        self._syncBolts()
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
     def draw(self, view):
@@ -169,210 +204,154 @@ class Wave(object):
         Precondition: view is instance of GView; it is inherited from GameApp
         """
         #DRAW A BLOCK OF ALIENS
-        for row in range(ALIEN_ROWS):
-            for col in range(ALIENS_IN_ROW):
-                alien = self._aliens[row][col]
-                if alien!=None:
-                    alien.draw(view)
+        if self._swarm != None:
+            self._swarm.draw(view)
+        for batch, records in self._aliens:
+            batch.draw(view)
         #DRAW THE DEFENSIVE LINE
         self._dline.draw(view)
         #DRAW THE SHIP
         if self._ship != None:
             self._ship.draw(view)
         #DRAW THE BOLTS
-        for bolt in self._bolts:
-            bolt.draw(view)
+        for slot in self._engine.getBolts().getSlots():
+            self._bolts[slot].draw(view)
 
     def aliensPassedDefLine(self):
         """
         Returns True if any alien which is not destroyed has passed
         the defensive line; Otherwise, returns False.
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien!=None and (alien.getY()-ALIEN_HEIGHT/2)<= DEFENSE_LINE:
-                    return True
-        return False
+        return self._engine.aliensPassedDefLine()
 
     #HIDDEN METHODS
 
     #HELPER METHODS FOR INITIALIZER
-    def _blockAliens(self):
-        """
-        Creates a block (a 2D list) of Alien objects.
-        """
-        # STARTING X COORDINATE OF THE BLOCK
-        block_left = ALIEN_H_SEP + ALIEN_WIDTH/2
-        # HEIGHT OF THE BLOCK OF ALIENS
-        block_height = ALIEN_ROWS * ALIEN_HEIGHT + (ALIEN_ROWS-1)*ALIEN_H_SEP
-        # STARTING Y COORDINATE OF THE BLOCK
-        block_bottom = GAME_HEIGHT - block_height - ALIEN_CEILING
-
-        self._aliens=[]
-        for row in range(ALIEN_ROWS):
-            list_row = []
-            factor = row % 6
-            if factor==0 or factor ==1:
-                picture = ALIEN_IMAGES[0]
-            elif factor==2 or factor ==3:
-                picture = ALIEN_IMAGES[1]
-            else:
-                picture = ALIEN_IMAGES[2]
-            for col in range(ALIENS_IN_ROW):
-                list_row.append(Alien(block_left+(ALIEN_WIDTH+ALIEN_H_SEP)*col,
-                block_bottom + (ALIEN_HEIGHT+ALIEN_V_SEP)*row,picture))
-            self._aliens.append(list_row)
+    def _blockAliens(self, swarm):
+        """
+        Creates the aliens at the engine positions.
+
+        In the normal game the aliens of each picture are drawn by one GBatch, so the
+        whole block costs one draw call per picture.  Every alien of a batch shows the
+        same frame, so the walk animation changes one frame per batch, not per alien.
+        In swarm mode it is a single Swarm for the whole block.
+
+        Parameter swarm: whether to play in swarm mode
+        Precondition: swarm is a bool
+        """
+        self._aliens = []
+        self._swarm = None
+        block = self._engine.getAliens()
+        data = block.getData()
+        self._blockPos = (float(data['x'][0]), float(data['y'][0]))
+        if swarm:
+            self._swarm = Swarm(block.getRows(), block.getCols(), block.getWidth(),
+            block.getHSep())
+            self._swarm.setBlock(*self._blockPos)
+            return
+        # Rows use each picture twice in a row: 0 0 1 1 2 2 0 0 ...
+        pictures = (np.arange(block.getRows()) % 6)//2
+        cols = block.getCols()
+        for index, picture in enumerate(ALIEN_IMAGES):
+            rows = (pictures == index).nonzero()[0]
+            if len(rows) == 0:
+                continue
+            records = (rows[:,None]*cols+np.arange(cols)).ravel()
+            batch = GBatch(source=picture, width=block.getWidth(),
+                           height=block.getHeight(), capacity=len(records),
+                           format=ALIEN_FORMAT)
+            self._clock.play(batch, ALIEN_WALK, ALIEN_WALK_SPEED*len(ALIEN_WALK),
+                             loop=True)
+            self._aliens.append((batch, records))
+        self._placeAliens()
 
     #HELPER METHODS FOR UPDATE
-    def _alienController(self,dt):
-        """
-        Moves the block of aliens and generates laser bolts from the aliens.
-
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float)
-        """
-        self._time += dt
-        if self._time >= self._waveSpeed:
-            rightest = self._findRightestAlien()
-            leftest = self._findLeftestAlien()
-
-            if self._direction == 'right':
-                if rightest.getX() + ALIEN_H_WALK <= (GAME_WIDTH -
-                (ALIEN_WIDTH/2 + ALIEN_H_SEP)):
-                    self._alienMove('right')
-                else:
-                    self._direction = 'left'
-                    self._alienMove('down')
-            elif self._direction == 'left':
-                if leftest.getX() - ALIEN_H_WALK >= ALIEN_WIDTH/2 + ALIEN_H_SEP:
-                    self._alienMove('left')
-                else:
-                    self._direction = 'right'
-                    self._alienMove('down')
-            self._stepsToFire -= 1
-            if self._stepsToFire == 0:
-                alienToShoot = random.choice(self._findBottomAliens())
-                if self._sound:
-                    self._pewAlienSound.play()
-                self._bolts.append(Bolt(alienToShoot.getX(),
-                alienToShoot.getY()-ALIEN_HEIGHT/2-BOLT_HEIGHT/2, -BOLT_SPEED))
-                self._stepsToFire = random.randint(1,BOLT_RATE)
-            self._time = 0
-
-    def _shipController(self, user_input):
-        """
-        Moves the ship to the left and to the right and generates ship laser
-         bolts, according to the user's input.
-
-        Parameter user_input: states whether the user pressed a certain key
-        Precondition: user_input is a list of bools
-        """
-        if user_input[0] == True:
-            self._ship.setX(self._ship.getX() + min(SHIP_MOVEMENT,
-            GAME_WIDTH - SHIP_WIDTH/2 - self._ship.getX()))
-        if user_input[1] == True:
-            self._ship.setX(self._ship.getX() - min(SHIP_MOVEMENT,
-            self._ship.getX() - SHIP_WIDTH/2))
-        if user_input[2]==True and self._existsPlayerBolt() == False:
-            if self._sound:
+    def _playEvents(self):
+        """
+        Plays the sound for every event reported by the engine (if sound is on).
+        """
+        for event in self._engine.popEvents():
+            if not self._sound:
+                continue
+            if event == EVENT_POP:
+                self._popSound.play()
+            elif event == EVENT_BLAST:
+                self._blastSound.play()
+            elif event == EVENT_SHIP_PEW:
                 self._pewShipSound.play()
-            self._bolts.append(Bolt(self._ship.getX(),
-            SHIP_BOTTOM + SHIP_HEIGHT + BOLT_HEIGHT/2, BOLT_SPEED))
-
-    def _boltsController(self):
-        """
-        This method animates the bolts and determines if any of them collides
-        with an alien or with the ship. If it does, the method removes the
-        corresponding bolt from the list of bolts, assignes None to the
-        destroyed alien/ship, and if an alien is destroyed, the method increases
-        the player's score and speeds up the rest of the aliens.
-        """
-        for bolt in self._bolts:
-            bolt.setY(bolt.getY() + bolt.getVel())
-            for row in range(ALIEN_ROWS):
-                for col in range(ALIENS_IN_ROW):
-                    if (self._aliens[row][col]!=None and bolt.isPlayerBolt() and
-                    self._aliens[row][col].collides(bolt)):
-                        if self._sound:
-                            self._popSound.play()
-                        self._aliens[row][col] = None
-                        self._score += (row+1)*10
-                        self._bolts.remove(bolt)
-                        self._aliensLeft -= 1
-                        #SPEED UP THE ALIENS
-                        self._waveSpeed *= ALIEN_ACCELERATION
-            if (self._ship != None and self._ship.collides(bolt)
-            and not bolt.isPlayerBolt()):
-                if self._sound:
-                    self._blastSound.play()
-                self._ship = None
-                self._bolts.remove(bolt)
-                self._lives -= 1
-            if (bolt.getY() - BOLT_HEIGHT/2 >= GAME_HEIGHT or
-            bolt.getY() + BOLT_HEIGHT/2 <= 0):
-                self._bolts.remove(bolt)
-
-    #HELPER METHODS FOR _alienController()
-    def _findRightestAlien(self):
-        """
-        Returns the rightmost alien which is not None.
-        """
-        rightest = None
-        for col in range(ALIENS_IN_ROW):
-            for row in range(ALIEN_ROWS):
-                if self._aliens[row][col] != None:
-                    rightest = self._aliens[row][col]
-        return rightest
-
-    def _findLeftestAlien(self):
-        """
-        Returns the leftmost alien which is not None.
-        """
-        leftest = None
-        for col in range(ALIENS_IN_ROW-1, -1, -1):
-            for row in range(ALIEN_ROWS):
-                if self._aliens[row][col] != None:
-                    leftest = self._aliens[row][col]
-        return leftest
-
-    def _alienMove(self, direction):
-        """
-        Moves the block of aliens with one step.
-
-        Parameter direction: the current direction of the wave
-        Precondition: direction is a string ('right', 'left', or 'down')
-        """
-        for row in self._aliens:
-            for alien in row:
-                if alien!=None:
-                    if direction=='right':
-                        alien.setX(alien.getX() + ALIEN_H_WALK)
-                    elif direction == 'left':
-                        alien.setX(alien.getX() - ALIEN_H_WALK)
-                    else:
-                        alien.setY(alien.getY() - ALIEN_V_WALK)
-
-    def _findBottomAliens(self):
-        """
-        Returns a list which includes the bottom alien from each column.
-        """
-        list = []
-        for col in range(ALIENS_IN_ROW):
-            bottom = None
-            for row in range(ALIEN_ROWS-1,-1,-1):
-                if self._aliens[row][col]!=None:
-                    bottom = self._aliens[row][col]
-            if bottom!=None:
-                list.append(bottom)
-        return list
-
-    #HELPER METHOD FOR _boltsController()
-    def _existsPlayerBolt(self):
-        """
-        Returns True if there is a player's bolt on the screen; Otherwise,
-        returns False.
-        """
-        for bolt in self._bolts:
-            if bolt.isPlayerBolt():
-                return True
-        return False
+            elif event == EVENT_ALIEN_PEW:
+                self._pewAlienSound.play()
+
+    def _syncShip(self):
+        """
+        Moves the ship to the engine position, or explodes it if it was destroyed.
+
+        When the engine destroys the ship, the ship plays its explosion for DEATH_SPEED
+        seconds, and is only removed once the explosion is over.
+        """
+        if self._ship == None:
+            return
+        x = self._engine.getShipX()
+        if x is not None:
+            if self._ship.getX() != x:
+                self._ship.setX(x)
+        elif not self._dying:
+            self._dying = True
+            self._clock.play(self._ship, SHIP_DEATH, DEATH_SPEED)
+        elif not self._clock.is_playing(self._ship):
+            self._ship = None
+            self._dying = False
+
+    def _syncAliens(self):
+        """
+        Moves the aliens to the engine positions, removing any destroyed aliens.
+
+        The alien batches are only placed again on frames where the block moved or an
+        alien died.  Since the block moves as a whole, one record tells whether it moved.
+        A frame therefore costs nothing per alien unless something changed, and then
+        only a few array operations for the whole block.
+        """
+        block = self._engine.getAliens()
+        killed = block.popKilled()
+        if self._swarm != None:
+            for index in killed:
+                self._swarm.kill(*divmod(index, block.getCols()))
+
+        data = block.getData()
+        pos = (float(data['x'][0]), float(data['y'][0]))
+        moved = pos != self._blockPos
+        self._blockPos = pos
+        if self._swarm != None:
+            if moved:
+                self._swarm.setBlock(*pos)
+        elif moved or killed:
+            self._placeAliens()
+
+    def _placeAliens(self):
+        """
+        Places every alien batch at the engine positions of its live aliens.
+        """
+        data = self._engine.getAliens().getData()
+        alive = data['alive']
+        for batch, records in self._aliens:
+            live = records[alive[records]]
+            batch.place(data['x'][live], data['y'][live])
+
+    def _syncBolts(self):
+        """
+        Moves the Bolt of every slot in use to its bolt in the engine.
+
+        There is one Bolt per slot of the engine bolt pool, created the first time the
+        slot is used and reused after that.  Firing a bolt therefore only creates a
+        GRectangle the first time a slot is used in a wave.
+        """
+        pool = self._engine.getBolts()
+        for slot in pool.getSlots():
+            bolt = self._bolts[slot]
+            if bolt == None:
+                self._bolts[slot] = Bolt(pool.getX(slot), pool.getY(slot),
+                pool.getVel(slot))
+            else:
+                bolt.setX(pool.getX(slot))
+                bolt.setY(pool.getY(slot))
+                bolt.setVel(pool.getVel(slot))